@@ -0,0 +1,40 @@
+"""Shared test fixtures."""
+
+import ast
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+
+APP_FILE = pathlib.Path(__file__).with_name("streamlit_app.py")
+
+
+def _touches_streamlit(nodes) -> bool:
+    return any(isinstance(n, ast.Name) and n.id == "st" for node in nodes for n in ast.walk(node))
+
+
+@pytest.fixture(scope="session")
+def app() -> SimpleNamespace:
+    """streamlit_app.py's imports, classes, functions and constants, without running the page.
+
+    Page statements and anything that uses ``st`` at import time (secrets-driven settings,
+    cached resources) are skipped; functions that read secrets when called still need a
+    Streamlit runtime, so test those through AppTest instead.
+    """
+    tree = ast.parse(APP_FILE.read_text())
+    body = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            body.append(node)
+        elif isinstance(node, (ast.FunctionDef, ast.ClassDef)) and not _touches_streamlit(node.decorator_list):
+            body.append(node)
+        elif (
+            # Module constants and type aliases only (UPPER_CASE / CamelCase); lowercase names are page state
+            isinstance(node, ast.Assign)
+            and all(isinstance(t, ast.Name) and t.id[0].isupper() for t in node.targets)
+            and not _touches_streamlit([node])
+        ):
+            body.append(node)
+    namespace: dict = {"__name__": "streamlit_app_definitions"}
+    exec(compile(ast.Module(body=body, type_ignores=[]), str(APP_FILE), "exec"), namespace)
+    return SimpleNamespace(**namespace)
@@ -0,0 +1,476 @@
+# load_test.py
+"""Concurrent-session load test for the Scan2Job wallboard.
+
+Drives many simulated sessions against ``streamlit_app.py`` headlessly with
+Streamlit's AppTest and reports, per session count:
+
+  * rerun latency percentiles (p50 / p95 / p99, including time queued behind other sessions)
+  * CPU seconds per session per minute and resident memory per session
+  * the saturation point: the first session count at which sessions can no longer
+    keep up with their rerun cadence
+
+While each level runs, a writer thread appends synthetic events to the CSV
+(``--append-rate`` per second), so reruns pay for incremental ingest, snapshot
+republishing and cache invalidation as on a live floor.
+
+With ``--serialization`` it instead times the people table's per-rerun prep plus
+st.dataframe serialization, old pandas path vs the per-snapshot Arrow table.
+
+Usage:
+    python load_test.py --associates 500,2000,5000 --sessions 1,2,4,8,16,32 --duration 30
+    python load_test.py --associates 500,5000,20000 --serialization
+
+All sessions share one process, like one Streamlit server on one host. AppTest
+swaps process-wide runtime globals while a script runs, so reruns are serialized
+behind a lock. Script runs are CPU-bound pandas work under the GIL anyway, so this
+is a close (slightly conservative) model of what a single server process can do,
+and it lets CPU time be attributed to the session that caused it.
+"""
+import argparse
+import csv
+import gc
+import os
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from streamlit import dataframe_util
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+APP_PASSWORD = "load-test"
+
+# ---------------------------
+# 1) SYNTHETIC DATA
+# ---------------------------
+
+CSV_COLUMNS = [
+    "ASSOCIATE_ID", "ASSOCIATE_NAME", "SHIFT_TYPE", "JOB_DEPARTMENT", "SOURCE", "WORK_DEPARTMENT",
+    "WORK_POSITION", "LINE", "BAY", "LOCATION", "START_TIME_LOCAL", "SUPERVISOR_NAME",
+]
+
+# (job department, share of headcount, scan source, [(work department, work position, line?)])
+SYNTHETIC_DEPARTMENTS = [
+    ("Production", 0.80, "Pick to Light", [("Assembly", "Picker", True), ("Kitting", "Stacker", True),
+                                           ("Site Support", "Kit Label Printer", False)]),
+    ("Warehouse", 0.08, "HighJump", [("Warehouse", "Putaway", False), ("Warehouse", "Replenishment", False),
+                                     ("Warehouse", "Inventory", False)]),
+    ("Shipping", 0.05, "Badgr", [("Shipping", "Loader", False)]),
+    ("Quality", 0.05, "Badgr", [("FSQ", "Quality Lead", False), ("FSQ", "Assembly Line Auditor", False)]),
+    ("Sanitation", 0.01, "Badgr", [("Sanitation", "Sanitor", False)]),
+    ("Fulfillment Training", 0.01, "Badgr", [("Fulfillment Training", "Trainee", False)]),
+]
+
+FIRST_NAMES = ["Ana", "Ben", "Carla", "Dev", "Eli", "Fatou", "Gus", "Hana", "Ivan", "Jo", "Kofi", "Lena"]
+LAST_NAMES = ["Alvarez", "Brooks", "Chen", "Diallo", "Evans", "Ferreira", "Garcia", "Huang", "Ito", "Jones"]
+
+
+def _synthetic_event(rng: random.Random, source: str, positions: list) -> dict:
+    """One scan event (or the occasional Time Off Task / floor entry) for an associate's department."""
+    roll = rng.random()
+    if roll < 0.05:
+        return {"SOURCE": "Compliance", "WORK_DEPARTMENT": "Compliance", "WORK_POSITION": "Time Off Task"}
+    if roll < 0.10:
+        return {"SOURCE": "Badgr", "WORK_DEPARTMENT": "HR/Admin", "WORK_POSITION": "Enter Production Floor"}
+    work_dept, work_pos, has_line = rng.choice(positions)
+    event = {"SOURCE": source, "WORK_DEPARTMENT": work_dept, "WORK_POSITION": work_pos}
+    if has_line:
+        event.update({"LINE": rng.choice([1, 3, 7, 8, 99]), "BAY": rng.randint(1, 9), "LOCATION": "AUTOMATION LINE"})
+    return event
+
+
+def write_synthetic_csv(path: str, associates: int, events_per_associate: int, shift_date: date, seed: int = 7) -> int:
+    """Write a day of synthetic scan/clock events in the app's CSV schema; returns the row count."""
+    rng = random.Random(seed)
+    supervisors = [f"Supervisor {i:02d}" for i in range(max(1, associates // 25))]
+    shift_start = datetime.combine(shift_date, datetime.min.time()) + timedelta(hours=6, minutes=30)
+    rows = []
+    for i in range(associates):
+        job_dept, _, source, positions = rng.choices(
+            SYNTHETIC_DEPARTMENTS, weights=[d[1] for d in SYNTHETIC_DEPARTMENTS]
+        )[0]
+        base = {
+            "ASSOCIATE_ID": str(3_000_000 + i),
+            "ASSOCIATE_NAME": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "SHIFT_TYPE": "Day Shift",
+            "JOB_DEPARTMENT": job_dept,
+            "SUPERVISOR_NAME": rng.choice(supervisors),
+        }
+        ts = shift_start + timedelta(seconds=rng.randint(0, 40 * 60))
+        rows.append({**base, "SOURCE": "Workday", "WORK_DEPARTMENT": "Timecard Punch", "WORK_POSITION": "Punch In", "START_TIME_LOCAL": ts})
+        for _ in range(max(0, events_per_associate - 1)):
+            ts += timedelta(seconds=rng.randint(60, 45 * 60))
+            rows.append({**base, **_synthetic_event(rng, source, positions), "START_TIME_LOCAL": ts})
+        if rng.random() < 0.05:
+            ts += timedelta(seconds=rng.randint(60, 30 * 60))
+            rows.append({**base, "SOURCE": "Workday", "WORK_DEPARTMENT": "Timecard Punch", "WORK_POSITION": "Punch Out", "START_TIME_LOCAL": ts})
+
+    rows.sort(key=lambda r: r["START_TIME_LOCAL"])
+    with open(path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            row["START_TIME_LOCAL"] = row["START_TIME_LOCAL"].strftime("%Y-%m-%d %H:%M:%S")
+            writer.writerow(row)
+    return len(rows)
+
+
+class SyntheticAppender:
+    """Appends scan events for the CSV's existing associates at ``rate`` events/second from a
+    background thread, so reruns keep ingesting, republishing snapshots and invalidating caches."""
+
+    def __init__(self, path: str, rate: float, seed: int = 11):
+        self.path = path
+        self.rate = rate
+        self.rng = random.Random(seed)
+        self.appended = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        with open(path, newline="") as fh:
+            rows = list(csv.DictReader(fh))
+        by_dept = {d[0]: d for d in SYNTHETIC_DEPARTMENTS}
+        self.roster = list({
+            r["ASSOCIATE_ID"]: ({k: r[k] for k in ["ASSOCIATE_ID", "ASSOCIATE_NAME", "SHIFT_TYPE", "JOB_DEPARTMENT", "SUPERVISOR_NAME"]},
+                                by_dept[r["JOB_DEPARTMENT"]])
+            for r in rows
+        }.values())
+        self.clock = max(datetime.strptime(r["START_TIME_LOCAL"], "%Y-%m-%d %H:%M:%S") for r in rows)
+
+    def _append(self, n: int) -> None:
+        with open(self.path, "a", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=CSV_COLUMNS)
+            for _ in range(n):
+                base, (_, _, source, positions) = self.rng.choice(self.roster)
+                self.clock += timedelta(seconds=self.rng.randint(0, 2))
+                writer.writerow({**base, **_synthetic_event(self.rng, source, positions),
+                                 "START_TIME_LOCAL": self.clock.strftime("%Y-%m-%d %H:%M:%S")})
+        self.appended += n
+
+    def _run(self) -> None:
+        carry = 0.0
+        while not self._stop.wait(1.0):
+            carry += self.rate
+            if int(carry):
+                self._append(int(carry))
+                carry -= int(carry)
+
+    def __enter__(self) -> "SyntheticAppender":
+        if self.rate > 0:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# ---------------------------
+# 2) SIMULATED SESSIONS
+# ---------------------------
+
+RUN_LOCK = threading.Lock()
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (falls back to peak RSS off Linux)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+class SimulatedSession:
+    """One wallboard viewer: logs in once, then cycles through the interactions a supervisor makes."""
+
+    SEARCH_TERMS = ["Production", "Picker", "Supervisor 0", "Ana", "3000"]
+
+    def __init__(self, csv_path: str, seed: int):
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=120)
+        self.at.secrets["APP_PASSWORD"] = APP_PASSWORD
+        self.at.secrets["DATA_CSV_PATH"] = csv_path
+        self.latencies: list[float] = []
+        self.cpu_sec = 0.0
+        self.errors = 0
+        self._step = 0
+
+    def _timed(self, action) -> None:
+        queued = time.perf_counter()
+        with RUN_LOCK:
+            cpu0 = time.process_time()
+            try:
+                action()
+                if self.at.exception:
+                    self.errors += 1
+            except Exception:
+                self.errors += 1
+            self.cpu_sec += time.process_time() - cpu0
+        self.latencies.append(time.perf_counter() - queued)
+
+    def login(self) -> None:
+        def _login():
+            self.at.run()
+            self.at.text_input[0].input(APP_PASSWORD)
+            self.at.button[0].click().run()
+        self._timed(_login)
+
+    def actions(self) -> list:
+        """The interaction cycle; each one is exactly one rerun."""
+        at = self.at
+        return [
+            lambda: at.run(),  # periodic wallboard refresh
+            lambda: at.text_input(key="search_q").input(self.rng.choice(self.SEARCH_TERMS)).run(),
+            lambda: at.run(),
+            lambda: at.text_input(key="search_q").input("").run(),
+            lambda: at.toggle(key="flt_not_scanned").set_value(True).run(),
+            lambda: at.toggle(key="flt_not_clocked").set_value(True).run(),
+            lambda: at.toggle(key="flt_not_scanned").set_value(False).run(),
+            lambda: at.toggle(key="flt_not_clocked").set_value(False).run(),
+            self._open_breakdowns,
+        ]
+
+    def step(self) -> None:
+        """Run the next interaction in the cycle."""
+        actions = self.actions()
+        self._timed(actions[self._step % len(actions)])
+        self._step += 1
+
+    def _open_breakdowns(self) -> None:
+        # Expander bodies always execute on rerun (open/closed is client-side only), so
+        # "opening" one costs a rerun plus reading the rendered breakdown tables.
+        self.at.run()
+        for exp in self.at.expander:
+            for df_el in exp.dataframe:
+                _ = df_el.value
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def warm_up(csv_path: str) -> float:
+    """Run one session through a full interaction cycle so the app import, the shared live
+    state and the per-snapshot caches are built; returns the warm RSS baseline in MB."""
+    session = SimulatedSession(csv_path, seed=-1)
+    session.login()
+    for _ in range(len(session.actions())):
+        session.step()
+    del session
+    gc.collect()
+    return _rss_mb()
+
+
+def run_level(csv_path: str, n_sessions: int, duration_sec: float, interval_sec: float, rss_baseline: float,
+              append_rate: float = 0.0) -> dict:
+    """Run ``n_sessions`` concurrent sessions for ``duration_sec`` and summarize them.
+
+    Memory per session is growth over ``rss_baseline`` (see warm_up), so one-time startup
+    cost is not charged to the first level. With ``append_rate`` > 0, new events are appended
+    to the CSV throughout the level, as on a live floor.
+    """
+    sessions = [SimulatedSession(csv_path, seed=i) for i in range(n_sessions)]
+    for s in sessions:
+        s.login()
+    rss_after_login = _rss_mb()
+    for s in sessions:
+        s.latencies.clear()
+        s.cpu_sec = 0.0
+
+    deadline = time.perf_counter() + duration_sec
+
+    def _drive(session: SimulatedSession) -> None:
+        # Stagger start so sessions do not rerun in lock-step
+        time.sleep(session.rng.uniform(0, interval_sec))
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            session.step()
+            time.sleep(max(0.0, interval_sec - (time.perf_counter() - started)))
+
+    with SyntheticAppender(csv_path, append_rate) as appender:
+        started = time.perf_counter()
+        threads = [threading.Thread(target=_drive, args=(s,), daemon=True) for s in sessions]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+    latencies = [lat for s in sessions for lat in s.latencies]
+    reruns = len(latencies)
+    offered = n_sessions * duration_sec / interval_sec
+    p95 = _percentile(latencies, 95)
+    return {
+        "sessions": n_sessions,
+        "reruns": reruns,
+        "errors": sum(s.errors for s in sessions),
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": p95 * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": (statistics.fmean(latencies) * 1000) if latencies else float("nan"),
+        "cpu_s_per_session_min": sum(s.cpu_sec for s in sessions) / n_sessions / (elapsed / 60),
+        "rss_mb": rss_after_login,
+        "rss_mb_per_session": (rss_after_login - rss_baseline) / n_sessions,
+        "throughput_rps": reruns / elapsed,
+        "appended_eps": appender.appended / elapsed,
+        # Saturated when the tail no longer fits in the rerun interval or sessions fall behind cadence
+        "saturated": bool(p95 > interval_sec or reruns < 0.9 * offered),
+    }
+
+
+# ---------------------------
+# 3) PEOPLE TABLE SERIALIZATION
+# ---------------------------
+
+# Same rename as the app's people table (PEOPLE_DISPLAY_COLUMNS)
+PEOPLE_TABLE_COLUMNS = {
+    "associate_id": "Id", "associate_name": "Name", "job_department": "Hiring Department",
+    "shift_type": "Shift Type", "supervisor_name": "Supervisor Name", "clocked_in": "Clocked In",
+    "scanned_in": "Scanned In", "work_department": "Work Department", "work_position": "Work Position",
+    "last_activity_ts": "Last Activity Timestamp",
+}
+SCANNED_SOURCES = {"Badgr", "HighJump", "Pick to Light"}
+
+
+def people_frame(csv_path: str) -> pd.DataFrame:
+    """people_df as the app builds it: latest record per associate plus scanned/clocked flags."""
+    events = pd.read_csv(csv_path, dtype=str)
+    events["START_TIME_LOCAL"] = pd.to_datetime(events["START_TIME_LOCAL"])
+    ids = events["ASSOCIATE_ID"]
+    punch = events["WORK_POSITION"].where(events["SOURCE"] == "Workday")
+    punch_in = events["START_TIME_LOCAL"].where(punch == "Punch In").groupby(ids).max()
+    punch_out = events["START_TIME_LOCAL"].where(punch == "Punch Out").groupby(ids).max()
+    people = (
+        events.sort_values("START_TIME_LOCAL", kind="stable").groupby("ASSOCIATE_ID").tail(1)
+        .rename(columns=str.lower).rename(columns={"start_time_local": "last_activity_ts"})
+        .sort_values("associate_id").reset_index(drop=True)
+    )
+    people["scanned_in"] = events["SOURCE"].isin(SCANNED_SOURCES).groupby(ids).any().reindex(people["associate_id"]).to_numpy()
+    clocked = punch_in.notna() & (punch_out.isna() | (punch_in > punch_out))
+    people["clocked_in"] = clocked.reindex(people["associate_id"]).to_numpy()
+    return people
+
+
+def _old_people_table(people: pd.DataFrame, positions: np.ndarray) -> bytes:
+    """Per rerun before the Arrow table: copy, mask, select/rename and take rows in pandas,
+    then st.dataframe converts the frame to Arrow."""
+    pretty = people.copy().assign(associate_name="—")[list(PEOPLE_TABLE_COLUMNS)].rename(columns=PEOPLE_TABLE_COLUMNS)
+    shown = pretty.iloc[positions]
+    return dataframe_util.convert_pandas_df_to_arrow_bytes(dataframe_util.convert_anything_to_pandas_df(shown, ensure_copy=False))
+
+
+def _new_people_table(table: pa.Table, positions: np.ndarray) -> bytes:
+    """Per rerun now: take the rows from the per-snapshot Arrow table and serialize it as is."""
+    return dataframe_util.convert_arrow_table_to_arrow_bytes(table.take(positions))
+
+
+def _best_ms(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def measure_serialization(csv_path: str, repeats: int = 20, seed: int = 3) -> list[dict]:
+    """Time people-table prep plus st.dataframe serialization per rerun (names masked), old vs new,
+    for all rows and for a ~10% filter result."""
+    people = people_frame(csv_path)
+    started = time.perf_counter()
+    display = people[list(PEOPLE_TABLE_COLUMNS)].rename(columns=PEOPLE_TABLE_COLUMNS).assign(Name="—")
+    table = pa.Table.from_pandas(display, preserve_index=False)
+    build_ms = (time.perf_counter() - started) * 1000
+    rng = np.random.default_rng(seed)
+    rows = []
+    for label, share in [("all rows", 1.0), ("~10% rows", 0.1)]:
+        positions = np.sort(rng.choice(len(people), size=max(1, round(len(people) * share)), replace=False))
+        rows.append({
+            "rows": label, "n": len(positions), "build_ms": build_ms,
+            "old_ms": _best_ms(lambda: _old_people_table(people, positions), repeats),
+            "new_ms": _best_ms(lambda: _new_people_table(table, positions), repeats),
+        })
+    return rows
+
+
+# ---------------------------
+# 4) REPORT
+# ---------------------------
+
+def _print_table(rows: list[dict]) -> None:
+    header = (
+        f"{'sessions':>8} {'reruns':>7} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'cpu s/sess/min':>14} {'MB/sess':>8} {'RSS MB':>8} {'rerun/s':>8} {'events/s':>8}  saturated"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['sessions']:>8} {r['reruns']:>7} {r['errors']:>4} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+            f"{r['p99_ms']:>8.0f} {r['cpu_s_per_session_min']:>14.2f} {r['rss_mb_per_session']:>8.1f} "
+            f"{r['rss_mb']:>8.0f} {r['throughput_rps']:>8.2f} {r['appended_eps']:>8.1f}  {'YES' if r['saturated'] else ''}"
+        )
+
+
+def _print_serialization(rows: list[dict]) -> None:
+    print(f"{'rows':>10} {'n':>7} {'old ms':>8} {'new ms':>8} {'speedup':>8}  (new: +{rows[0]['build_ms']:.1f} ms once per snapshot)")
+    for r in rows:
+        print(f"{r['rows']:>10} {r['n']:>7} {r['old_ms']:>8.2f} {r['new_ms']:>8.2f} {r['old_ms'] / r['new_ms']:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--associates", default="500,2000,5000", help="comma-separated synthetic headcounts")
+    parser.add_argument("--events-per-associate", type=int, default=8)
+    parser.add_argument("--sessions", default="1,2,4,8,16,32", help="comma-separated session counts to step through")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to hold each session count")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between reruns per session (wallboard refresh)")
+    parser.add_argument("--append-rate", type=float, default=2.0,
+                        help="synthetic events appended to the CSV per second during each level (0 = static file)")
+    parser.add_argument("--shift-date", default=date.today().isoformat())
+    parser.add_argument("--serialization", action="store_true",
+                        help="only time people-table prep + st.dataframe serialization (old pandas path vs Arrow table)")
+    args = parser.parse_args()
+
+    shift_date = date.fromisoformat(args.shift_date)
+    levels = [int(x) for x in args.sessions.split(",") if x.strip()]
+    with tempfile.TemporaryDirectory(prefix="scan2job-load-") as tmp:
+        for associates in [int(x) for x in args.associates.split(",") if x.strip()]:
+            csv_path = os.path.join(tmp, f"synthetic_{associates}.csv")
+            n_rows = write_synthetic_csv(csv_path, associates, args.events_per_associate, shift_date)
+            if args.serialization:
+                print(f"\n== {associates} associates, {n_rows} events: people table per rerun, names masked ==")
+                _print_serialization(measure_serialization(csv_path))
+                continue
+            print(f"\n== {associates} associates, {n_rows} events (+{args.append_rate:g}/s appended), "
+                  f"rerun every {args.interval:g}s, {args.duration:g}s per level ==")
+            rss_baseline = warm_up(csv_path)
+            rows = []
+            for n in levels:
+                rows.append(run_level(csv_path, n, args.duration, args.interval, rss_baseline, args.append_rate))
+                if rows[-1]["saturated"]:
+                    break  # no point adding sessions past saturation
+            _print_table(rows)
+            saturated = [r["sessions"] for r in rows if r["saturated"]]
+            if saturated:
+                ok = [r["sessions"] for r in rows if not r["saturated"]]
+                print(f"Saturation at {saturated[0]} sessions; max sustainable tested: {max(ok) if ok else 0}")
+            else:
+                print(f"No saturation up to {levels[-1]} sessions")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,20 @@
 # app.py
+import csv
+import io
+import os
 import time
 import hashlib
-from datetime import datetime, timedelta, timezone
+import heapq
+import json
+import logging
+import shutil
+import threading
+import zipfile
+from collections import OrderedDict, deque, namedtuple
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
 
 def _set_query_param_t():
@@ -210,30 +222,35 @@ REFRESH_SEC = 5
 # ---------------------------
 # TOP: DEPARTMENT CARDS (On Floor by Hiring Department)
 # ---------------------------
-def render_department_cards(df: pd.DataFrame) -> None:
+def render_department_cards(df: pd.DataFrame, card_counts: pd.DataFrame | None = None) -> None:
     """Render a horizontal row of cards showing On Floor counts by hiring department.
 
-    Uses df columns: associate_id, job_department, on_floor.
+    Uses df columns: associate_id, job_department, on_floor. Pass precomputed
+    ``card_counts`` (job_department, associate_id) to skip the groupby.
     """
-    try:
-        on_floor_df = df[df["on_floor"]].copy()
-    except Exception:
-        on_floor_df = df.copy()
+    if card_counts is None:
+        try:
+            on_floor_df = df[df["on_floor"]].copy()
+        except Exception:
+            on_floor_df = df.copy()
 
-    if on_floor_df.empty:
-        return
+        if on_floor_df.empty:
+            return
 
-    card_counts = (
-        on_floor_df.fillna({"job_department": "—"})
-        .groupby("job_department")["associate_id"].nunique()
-        .sort_values(ascending=False)
-        .reset_index()
-    )
+        card_counts = (
+            on_floor_df.fillna({"job_department": "—"})
+            .groupby("job_department")["associate_id"].nunique()
+            .sort_values(ascending=False)
+            .reset_index()
+        )
+    elif card_counts.empty:
+        return
 
     now_time = datetime.now().strftime("%H:%M:%S")
 
     # Section header with total on-floor headcount in brackets (match subheader style)
-    total_on_floor = int(on_floor_df["associate_id"].nunique())
+    # One row per associate, so department counts sum to the unique total
+    total_on_floor = int(card_counts["associate_id"].sum())
     # Render dynamic title with inline micro-info icon
     _window = globals().get("FLOOR_WINDOW_MIN", None)
     _win_txt = f" within the last **{_window} minutes**" if _window else ""
@@ -288,6 +305,9 @@ time.sleep(REFRESH_SEC * 0.0)  # no-op; keep it simple. Use st_autorefresh if yo
 # 1) DATA LOADING FROM CSV
 # ---------------------------
 
+# Source CSV; override via secrets (e.g. to point the load-test harness at synthetic data)
+DATA_CSV_PATH = str(st.secrets.get("DATA_CSV_PATH", "Scan2Job Realtime Sample Data.csv"))
+
 SCANNED_SOURCES = {"Badgr", "HighJump", "Pick to Light"}
 
 # Mapping of WORK_DEPARTMENT to Work Department Group for reporting
@@ -303,91 +323,1173 @@ WORK_DEPT_GROUP_MAP = {
     "FSQ": "Quality",
 }
 
-@st.cache_data(ttl=30)
-def load_associates_from_csv(csv_path: str = "Scan2Job Realtime Sample Data.csv") -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
-    # Ensure expected columns exist
-    # New CSV schema: ASSOCIATE_ID, ASSOCIATE_NAME, SHIFT_TYPE, JOB_DEPARTMENT, SOURCE, WORK_DEPARTMENT,
-    # WORK_POSITION, LINE, BAY, LOCATION, START_TIME_LOCAL
-    # We only require the fields the app uses.
-    expected_cols = {
-        "ASSOCIATE_ID",
-        "ASSOCIATE_NAME",
-        "SUPERVISOR_NAME",
-        "SHIFT_TYPE",
-        "JOB_DEPARTMENT",
-        "SOURCE",
-        "WORK_DEPARTMENT",
-        "WORK_POSITION",
-        "START_TIME_LOCAL",
-    }
-    missing = expected_cols.difference(df.columns)
-    if missing:
-        raise ValueError(f"CSV missing columns: {sorted(missing)}")
-    df["START_TIME_LOCAL"] = pd.to_datetime(df["START_TIME_LOCAL"], errors="coerce")
-
-    # Latest record per associate (for stable department display)
-    df_sorted = df.sort_values(["ASSOCIATE_ID","START_TIME_LOCAL"]).dropna(subset=["ASSOCIATE_ID"])  # type: ignore
-    latest_idx = df_sorted.groupby("ASSOCIATE_ID")["START_TIME_LOCAL"].idxmax()
-    latest_cols = [
-        "ASSOCIATE_ID","ASSOCIATE_NAME","SUPERVISOR_NAME","JOB_DEPARTMENT","WORK_DEPARTMENT","WORK_POSITION","START_TIME_LOCAL","SHIFT_TYPE"
-    ]
-    if "LINE" in df_sorted.columns:
-        latest_cols.append("LINE")
-    latest = df_sorted.loc[latest_idx, latest_cols].rename(columns={
-        "ASSOCIATE_ID":"associate_id",
-        "ASSOCIATE_NAME":"associate_name",
-        "SUPERVISOR_NAME":"supervisor_name",
-        "JOB_DEPARTMENT":"job_department",
-        "WORK_DEPARTMENT":"work_department",
-        "WORK_POSITION":"work_position",
-        "START_TIME_LOCAL":"last_activity_ts",
-        "SHIFT_TYPE":"shift_type",
-        "LINE":"line",
+# Mapping from Work Department -> Job Department (group) used by the Scanned-in Breakdown
+WORK_TO_JOB_GROUP = {
+    "Production": "Production",
+    "Warehouse": "Warehouse",
+    "Fulfillment Training": "Fulfillment Training",
+    "FSQ": "Quality",
+    "Sanitation": "Sanitation",
+    "Shipping": "Shipping",
+    # Sub-departments that belong to Production
+    "Assembly": "Production",
+    "Kitting": "Production",
+    "Site Support": "Production",
+    # Common admin sub-departments treated as Other at the job level
+    "Admin": "Other",
+    "HR/Admin": "Other",
+}
+
+# Display-level values treated as missing in breakdown labels
+NA_LABELS = {"": "NA", "None": "NA", "—": "NA", "nan": "NA", "NaN": "NA"}
+
+# Columns the app requires from the CSV. Schema: ASSOCIATE_ID, ASSOCIATE_NAME, SHIFT_TYPE, JOB_DEPARTMENT,
+# SOURCE, WORK_DEPARTMENT, WORK_POSITION, LINE, BAY, LOCATION, START_TIME_LOCAL, SUPERVISOR_NAME
+REQUIRED_CSV_COLUMNS = {
+    "ASSOCIATE_ID",
+    "ASSOCIATE_NAME",
+    "SUPERVISOR_NAME",
+    "SHIFT_TYPE",
+    "JOB_DEPARTMENT",
+    "SOURCE",
+    "WORK_DEPARTMENT",
+    "WORK_POSITION",
+    "START_TIME_LOCAL",
+}
+
+# Latest-record columns (for stable department display) → people_df names
+PEOPLE_COLUMNS = {
+    "ASSOCIATE_ID": "associate_id",
+    "ASSOCIATE_NAME": "associate_name",
+    "SUPERVISOR_NAME": "supervisor_name",
+    "JOB_DEPARTMENT": "job_department",
+    "WORK_DEPARTMENT": "work_department",
+    "WORK_POSITION": "work_position",
+    "START_TIME_LOCAL": "last_activity_ts",
+    "SHIFT_TYPE": "shift_type",
+    "LINE": "line",
+}
+
+
+class PeopleState:
+    """Latest record and any-event flags per associate, maintained incrementally; feeds people_df."""
+
+    def __init__(self):
+        self.latest = pd.DataFrame()
+        self.flags = pd.DataFrame()
+        self._snapshot: pd.DataFrame | None = None
+
+    def ingest(self, events: pd.DataFrame) -> None:
+        missing = REQUIRED_CSV_COLUMNS.difference(events.columns)
+        if missing:
+            raise ValueError(f"CSV missing columns: {sorted(missing)}")
+        ev = events.dropna(subset=["ASSOCIATE_ID"])
+        if ev.empty:
+            return
+
+        # Latest record per associate across the previous state and this batch
+        cols = [c for c in PEOPLE_COLUMNS if c in ev.columns]
+        combined = ev[cols] if self.latest.empty else pd.concat([self.latest, ev[cols]], ignore_index=True)
+        self.latest = (
+            # Newest first; on timestamp ties the earlier record wins, as with idxmax on the full log
+            combined.sort_values(["ASSOCIATE_ID", "START_TIME_LOCAL"], ascending=[True, False], na_position="last", kind="stable")
+            .groupby("ASSOCIATE_ID").head(1)
+            .reset_index(drop=True)
+        )
+
+        # Flags by associate (any record matching condition) and clock punches
+        ids = ev["ASSOCIATE_ID"]
+        src_lower = ev["SOURCE"].astype(str).str.casefold()
+        pos_lower = ev["WORK_POSITION"].astype(str).str.casefold()
+        unscanned_mask = (
+            src_lower.eq("compliance")
+            | ev["WORK_DEPARTMENT"].astype(str).str.casefold().eq("compliance")
+            | pos_lower.eq("time off task")
+        )
+        workday = src_lower.eq("workday")
+        ts = ev["START_TIME_LOCAL"]
+        batch = pd.DataFrame({
+            "scanned_in": ev["SOURCE"].astype(str).isin(SCANNED_SOURCES).groupby(ids).any(),
+            "unscanned": unscanned_mask.groupby(ids).any(),
+            "punch_in": ts.where(workday & pos_lower.eq("punch in")).groupby(ids).max(),
+            "punch_out": ts.where(workday & pos_lower.eq("punch out")).groupby(ids).max(),
+        })
+        self.flags = batch if self.flags.empty else pd.concat([self.flags, batch]).groupby(level=0).max()
+        self._snapshot = None
+
+    def snapshot(self) -> pd.DataFrame:
+        """people_df for the current state; built once per change and shared (treat as read-only)."""
+        if self._snapshot is None:
+            flag_cols = ["on_floor", "scanned_in", "unscanned", "clocked_in"]
+            if self.latest.empty:
+                return pd.DataFrame(columns=[*PEOPLE_COLUMNS.values(), *flag_cols])
+            people = self.latest.rename(columns=PEOPLE_COLUMNS).sort_values("associate_id").reset_index(drop=True)
+            f = self.flags.reindex(people["associate_id"])
+            # Every associate in the log is on the floor
+            people["on_floor"] = True
+            people["scanned_in"] = f["scanned_in"].fillna(False).astype(bool).to_numpy()
+            people["unscanned"] = f["unscanned"].fillna(False).astype(bool).to_numpy()
+            # Clocked in: latest Workday 'Punch in' with no later 'Punch out'
+            clocked = f["punch_in"].notna() & (f["punch_out"].isna() | (f["punch_in"] > f["punch_out"]))
+            people["clocked_in"] = clocked.to_numpy()
+            self._snapshot = people
+        return self._snapshot
+
+    def to_checkpoint(self) -> tuple[dict, dict[str, pd.DataFrame]]:
+        return {}, {"latest": self.latest, "flags": self.flags}
+
+    @classmethod
+    def from_checkpoint(cls, meta: dict, frames: dict[str, pd.DataFrame]) -> "PeopleState":
+        state = cls()
+        state.latest, state.flags = frames["latest"], frames["flags"]
+        return state
+
+# ---------------------------
+# 1b) LIVE EVENT STREAM (incremental tail of the source CSV)
+# ---------------------------
+
+class CsvEventTail:
+    """Reads only the rows appended to the source CSV since the previous poll.
+
+    Tracks a byte offset plus a fingerprint of the consumed bytes (the first and the last
+    FINGERPRINT_BYTES before the offset). If the file shrinks, the offset no longer ends a
+    line, or the fingerprint changes (rotation, replacement, in-place rewrite) the tail
+    restarts at 0.
+    """
+
+    FINGERPRINT_BYTES = 4096
+
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        self.columns: list[str] = []
+        self.offset = 0
+        self.fingerprint = ""
+        self._last_size = -1
+
+    def _fingerprint(self, fh, offset: int) -> str:
+        digest = hashlib.sha256()
+        fh.seek(0)
+        digest.update(fh.read(min(offset, self.FINGERPRINT_BYTES)))
+        start = max(0, offset - self.FINGERPRINT_BYTES)
+        fh.seek(start)
+        digest.update(fh.read(offset - start))
+        return digest.hexdigest()[:16]
+
+    def _consumed_intact(self, fh, size: int, offset: int, fingerprint: str) -> bool:
+        """True if the first ``offset`` bytes still look like the ones already consumed."""
+        if size < offset:
+            return False
+        # The offset must sit on a line boundary: after a newline, or before one / EOF when the
+        # last consumed row had no newline yet
+        fh.seek(offset - 1)
+        around = fh.read(2)
+        if around[:1] != b"\n" and around[1:] not in (b"", b"\r", b"\n"):
+            return False
+        return self._fingerprint(fh, offset) == fingerprint
+
+    def poll(self) -> tuple[pd.DataFrame, bool]:
+        """Return (new_events, reset). ``reset`` means downstream state must be rebuilt."""
+        reset = False
+        with open(self.csv_path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if self.offset and not self._consumed_intact(fh, size, self.offset, self.fingerprint):
+                self.offset, self.columns, self._last_size, reset = 0, [], -1, True
+            if not self.offset:
+                fh.seek(0)
+                header = fh.readline()
+                if not header.endswith(b"\n"):
+                    return pd.DataFrame(columns=self.columns), reset  # header still being written
+                self.columns = next(csv.reader([header.decode("utf-8-sig")]))
+                self.offset = len(header)
+            fh.seek(self.offset)
+            chunk = fh.read()
+        # Hold back a trailing partial line until the file stops growing (a cold start may land mid-write)
+        if chunk and not chunk.endswith(b"\n") and size != self._last_size:
+            chunk = chunk[: chunk.rfind(b"\n") + 1]
+        self._last_size = size
+        if not chunk.strip():
+            return pd.DataFrame(columns=self.columns), reset
+        # Every schema column is text; per-chunk inference would type the same column differently
+        # from one poll to the next (LINE 3 vs 'L4'), which no checkpoint or partition can store
+        events = pd.read_csv(io.BytesIO(chunk), header=None, names=self.columns, dtype=str)
+        self.offset += len(chunk)
+        with open(self.csv_path, "rb") as fh:
+            self.fingerprint = self._fingerprint(fh, self.offset)
+        events["START_TIME_LOCAL"] = pd.to_datetime(events["START_TIME_LOCAL"], errors="coerce")
+        if "LINE" in events.columns:
+            events["LINE"] = _line_labels(events["LINE"])
+        return events, reset
+
+    def to_checkpoint(self) -> dict:
+        return {
+            "csv_path": self.csv_path, "columns": self.columns, "offset": self.offset,
+            "fingerprint": self.fingerprint, "last_size": self._last_size,
+        }
+
+    @classmethod
+    def from_checkpoint(cls, csv_path: str, meta: dict) -> "CsvEventTail":
+        """Resume at the checkpointed offset; raises ValueError if the source is not the checkpointed file."""
+        tail = cls(csv_path)
+        with open(csv_path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if meta["csv_path"] != csv_path or not tail._consumed_intact(fh, size, int(meta["offset"]), meta["fingerprint"]):
+                raise ValueError("checkpoint does not match the current source file")
+        tail.columns, tail.offset, tail.fingerprint = list(meta["columns"]), int(meta["offset"]), meta["fingerprint"]
+        tail._last_size = int(meta["last_size"])
+        return tail
+
+
+def _line_labels(series: pd.Series) -> pd.Series:
+    """Canonical LINE labels: numeric lines as floats ('99' and 99 → '99.0', as a whole-file
+    read shows them), other labels (e.g. 'L4') stripped as-is; blanks stay missing."""
+    text = series.astype(str).str.strip()
+    num = pd.to_numeric(text, errors="coerce")
+    labels = text.where(num.isna(), num.astype(float).astype(str))
+    return labels.where(series.notna() & text.ne(""))
+
+
+def _clean_labels(series: pd.Series) -> pd.Series:
+    """Normalize display labels the same way the breakdown does (blanks → 'NA')."""
+    return series.astype(str).str.strip().replace(NA_LABELS).fillna("NA")
+
+
+def _position_events(events: pd.DataFrame) -> pd.DataFrame:
+    """Reduce raw events to position changes (scans, Time Off Task) and shift ends (punch out)."""
+    src = events["SOURCE"].astype(str)
+    src_lower = src.str.casefold()
+    pos_lower = events["WORK_POSITION"].astype(str).str.casefold()
+    is_position = (
+        src.isin(SCANNED_SOURCES)
+        | src_lower.eq("compliance")
+        | events["WORK_DEPARTMENT"].astype(str).str.casefold().eq("compliance")
+        | pos_lower.eq("time off task")
+    )
+    is_end = src_lower.eq("workday") & pos_lower.eq("punch out")
+    ev = events[(is_position | is_end) & events["START_TIME_LOCAL"].notna() & events["ASSOCIATE_ID"].notna()]
+    work_dept = ev["WORK_DEPARTMENT"].astype(str).str.strip()
+    line = ev["LINE"] if "LINE" in ev.columns else pd.Series(float("nan"), index=ev.index)
+    out = pd.DataFrame({
+        "associate_id": ev["ASSOCIATE_ID"].astype(str),
+        "ts": ev["START_TIME_LOCAL"],
+        "job_group": work_dept.map(WORK_TO_JOB_GROUP).fillna("Other"),
+        "work_department": _clean_labels(work_dept),
+        "line": _clean_labels(line),
+        "work_position": _clean_labels(ev["WORK_POSITION"]),
+        "is_end": is_end[ev.index],
     })
+    out["key"] = (out["work_department"] + "|" + out["line"] + "|" + out["work_position"]).where(~out["is_end"])
+    return out
+
+
+DWELL_KEYS = ["job_group", "work_department", "line", "work_position"]
+
+
+class DwellTracker:
+    """Per-associate time-in-position intervals, maintained incrementally from new events.
 
-    # Flags by associate (any record matching condition)
-    source_series = df["SOURCE"].astype(str)
-    work_dept_series = df["WORK_DEPARTMENT"].astype(str)
-    work_pos_series = df["WORK_POSITION"].astype(str)
+    Each batch is sorted by (associate, time) and diffed within associate in one vectorized
+    pass; the still-open interval of every associate is carried into the next batch.
+    Derived views are built once per change and shared (treat as read-only).
+    """
 
-    scanned_ids = df[source_series.isin(SCANNED_SOURCES)]["ASSOCIATE_ID"].dropna().astype(str).unique()
-    unscanned_mask = (
-        source_series.str.casefold().eq("compliance") |
-        work_dept_series.str.casefold().eq("compliance") |
-        work_pos_series.str.casefold().eq("time off task")
+    def __init__(self):
+        self.open = pd.DataFrame(columns=["associate_id", "ts", *DWELL_KEYS, "is_end", "key", "stint_start"])
+        self.closed = pd.DataFrame(columns=["dwell_min", "stints"], index=pd.MultiIndex.from_tuples([], names=["associate_id", *DWELL_KEYS]))
+        self.switches = pd.Series(dtype="int64")
+        self.as_of = pd.NaT
+        self._views: dict[str, pd.DataFrame] = {}
+
+    def _view(self, name: str, build) -> pd.DataFrame:
+        if name not in self._views:
+            self._views[name] = build()
+        return self._views[name]
+
+    def ingest(self, events: pd.DataFrame) -> None:
+        new = _position_events(events)
+        if new.empty:
+            return
+        new["stint_start"] = pd.NaT
+        new["carry"] = False
+        carry = self.open[self.open["associate_id"].isin(new["associate_id"].unique())].assign(carry=True)
+        ev = pd.concat([carry, new], ignore_index=True) if not carry.empty else new.reset_index(drop=True)
+        ev = ev.sort_values(["associate_id", "ts", "carry"], ascending=[True, True, False], kind="stable").reset_index(drop=True)
+
+        g = ev.groupby("associate_id", sort=False)
+        prev_key = g["key"].shift(1)
+        next_ts = g["ts"].shift(-1)
+        entered = ~ev["carry"] & ~ev["is_end"] & (prev_key.isna() | (prev_key != ev["key"]))
+        switched = entered & prev_key.notna()
+        ev["stint_start"] = ev["stint_start"].where(ev["carry"], ev["ts"].where(entered))
+        ev["stint_start"] = ev.groupby("associate_id", sort=False)["stint_start"].ffill()
+
+        # Closed intervals: a position event followed by any later event of the same associate
+        closed_mask = ~ev["is_end"] & next_ts.notna()
+        minutes = ((next_ts - ev["ts"]).dt.total_seconds().clip(lower=0) / 60).where(closed_mask, 0.0)
+        batch = (
+            ev.assign(dwell_min=minutes, stints=entered.astype("int64"))[~ev["is_end"]]
+            .groupby(["associate_id", *DWELL_KEYS])[["dwell_min", "stints"]].sum()
+        )
+        self.closed = batch if self.closed.empty else self.closed.add(batch, fill_value=0)
+        self.switches = self.switches.add(switched.groupby(ev["associate_id"]).sum(), fill_value=0).astype("int64")
+
+        last = g.tail(1)
+        touched = ev["associate_id"].unique()
+        still_open = last[~last["is_end"]].drop(columns="carry")
+        kept = self.open[~self.open["associate_id"].isin(touched)]
+        self.open = still_open.reset_index(drop=True) if kept.empty else pd.concat([kept, still_open], ignore_index=True)
+        batch_max = ev["ts"].max()
+        self.as_of = batch_max if pd.isna(self.as_of) else max(self.as_of, batch_max)
+        self._views = {}
+
+    def to_checkpoint(self) -> tuple[dict, dict[str, pd.DataFrame]]:
+        return {"as_of": _ts_to_meta(self.as_of)}, {
+            "open": self.open, "closed": self.closed, "switches": self.switches.to_frame("switches"),
+        }
+
+    @classmethod
+    def from_checkpoint(cls, meta: dict, frames: dict[str, pd.DataFrame]) -> "DwellTracker":
+        tracker = cls()
+        tracker.open, tracker.closed = frames["open"], frames["closed"]
+        tracker.switches = frames["switches"]["switches"]
+        tracker.as_of = _ts_from_meta(meta["as_of"])
+        return tracker
+
+    def _with_open(self) -> pd.DataFrame:
+        """Closed dwell plus the running minutes of each open interval (up to the latest event)."""
+        return self._view("with_open", self._build_with_open)
+
+    def _build_with_open(self) -> pd.DataFrame:
+        open_min = ((self.as_of - self.open["ts"]).dt.total_seconds().clip(lower=0) / 60) if not self.open.empty else 0.0
+        running = (
+            self.open.assign(dwell_min=open_min, stints=0)
+            .groupby(["associate_id", *DWELL_KEYS])[["dwell_min", "stints"]].sum()
+        )
+        if self.closed.empty:
+            return running
+        return self.closed.add(running, fill_value=0) if not running.empty else self.closed
+
+    def position_dwell(self) -> pd.DataFrame:
+        """Dwell minutes per job group, work department, line and position."""
+        return self._view("position_dwell", self._build_position_dwell)
+
+    def _build_position_dwell(self) -> pd.DataFrame:
+        per_assoc = self._with_open().reset_index()
+        if per_assoc.empty:
+            return pd.DataFrame(columns=[*DWELL_KEYS, "dwell_min", "stints", "associates"])
+        return (
+            per_assoc.groupby(DWELL_KEYS)
+            .agg(dwell_min=("dwell_min", "sum"), stints=("stints", "sum"), associates=("associate_id", "nunique"))
+            .reset_index()
+        )
+
+    def associate_summary(self) -> pd.DataFrame:
+        """One row per associate: current position, minutes in it, switches and total tracked minutes."""
+        return self._view("associate_summary", self._build_associate_summary)
+
+    def _build_associate_summary(self) -> pd.DataFrame:
+        if self.open.empty and self.closed.empty:
+            return pd.DataFrame(columns=["associate_id", "work_position", "line", "minutes_in_position", "switches", "tracked_min"])
+        totals = self._with_open().groupby(level="associate_id")["dwell_min"].sum().rename("tracked_min")
+        current = self.open.set_index("associate_id")[["work_position", "line", "stint_start"]].copy()
+        current["minutes_in_position"] = (self.as_of - current["stint_start"]).dt.total_seconds().clip(lower=0) / 60
+        out = current.drop(columns="stint_start").join(totals, how="outer")
+        out["switches"] = self.switches.reindex(out.index).fillna(0).astype("int64")
+        return out.rename_axis("associate_id").reset_index()
+
+    def positions(self) -> pd.DataFrame:
+        """Dwell per associate and position (one row each)."""
+        return self._view("positions", self._build_positions)
+
+    def _build_positions(self) -> pd.DataFrame:
+        per_assoc = self._with_open()
+        if per_assoc.empty:
+            return pd.DataFrame(columns=["associate_id", *DWELL_KEYS, "dwell_min", "stints"])
+        return per_assoc.reset_index()
+
+    def associate_positions(self, associate_id: str) -> pd.DataFrame:
+        """Per-position dwell for one associate (drill-down)."""
+        return associate_positions(self.positions(), associate_id)
+
+
+def associate_positions(positions: pd.DataFrame, associate_id: str) -> pd.DataFrame:
+    """Rows of ``positions`` for one associate, longest dwell first."""
+    return (
+        positions[positions["associate_id"] == associate_id]
+        .drop(columns="associate_id")
+        .sort_values("dwell_min", ascending=False)
     )
-    unscanned_ids = df[unscanned_mask]["ASSOCIATE_ID"].dropna().astype(str).unique()
-    on_floor_ids = df["ASSOCIATE_ID"].dropna().astype(str).unique()
 
-    people_df = latest.copy().reset_index(drop=True)
-    people_df["on_floor"] = people_df["associate_id"].astype(str).isin(on_floor_ids)
-    people_df["scanned_in"] = people_df["associate_id"].astype(str).isin(scanned_ids)
-    people_df["unscanned"] = people_df["associate_id"].astype(str).isin(unscanned_ids)
 
-    # Compute 'clocked_in' using full event history: latest Workday 'Punch in' with no later 'Punch out'
-    try:
-        src_lower = df["SOURCE"].astype(str).str.casefold()
-        pos_lower = df["WORK_POSITION"].astype(str).str.casefold()
-        wd_df = df[src_lower.eq("workday")].copy()
-        wd_df["START_TIME_LOCAL"] = pd.to_datetime(wd_df["START_TIME_LOCAL"], errors="coerce")
-        punch_in_ts = (
-            wd_df[pos_lower[wd_df.index].eq("punch in")]
-            .groupby("ASSOCIATE_ID")["START_TIME_LOCAL"].max()
+# ---------------------------
+# 1c) ALERT RULES (incremental, timer-driven)
+# ---------------------------
+
+# kind = clocked_no_scan: clocked in with no scan since punch-in, for more than `minutes` after punch-in
+# kind = position_dwell:  current position equals `position` for more than `minutes`
+# kind = line_headcount:  associates currently on a line below `targets[line]`
+DEFAULT_ALERT_RULES = [
+    {"id": "clocked_no_scan", "kind": "clocked_no_scan", "minutes": 20, "label": "Clocked in, not scanned > 20 min"},
+    {"id": "time_off_task", "kind": "position_dwell", "position": "Time Off Task", "minutes": 15, "label": "Time Off Task > 15 min"},
+    {"id": "line_headcount", "kind": "line_headcount", "targets": {}, "label": "Line headcount below target"},
+]
+
+
+class TimerWheel:
+    """Timers bucketed by slot (default one minute); only due buckets are touched on expiry.
+
+    Entries are never cancelled: a re-evaluation of a stale entry is a cheap no-op.
+    """
+
+    def __init__(self, slot_sec: int = 60):
+        self.slot_sec = slot_sec
+        self.slots: dict[int, dict[str, set]] = {}
+        self._heap: list[int] = []
+
+    def _slot(self, ts):
+        return (ts - pd.Timestamp(0)) // pd.Timedelta(seconds=self.slot_sec)
+
+    def schedule(self, rule_id: str, due: pd.Series) -> None:
+        """Schedule ``due`` (subject → timestamp) for ``rule_id``."""
+        if due.empty:
+            return
+        slots = self._slot(due).astype("int64")
+        for slot, subjects in slots.groupby(slots).groups.items():
+            if slot not in self.slots:
+                self.slots[slot] = {}
+                heapq.heappush(self._heap, slot)
+            self.slots[slot].setdefault(rule_id, set()).update(subjects)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [(slot, rule_id, subject) for slot, rules in self.slots.items() for rule_id, subjects in rules.items() for subject in subjects],
+            columns=["slot", "rule_id", "subject"],
         )
-        punch_out_ts = (
-            wd_df[pos_lower[wd_df.index].eq("punch out")]
-            .groupby("ASSOCIATE_ID")["START_TIME_LOCAL"].max()
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "TimerWheel":
+        wheel = cls()
+        for (slot, rule_id), subjects in frame.groupby(["slot", "rule_id"])["subject"]:
+            wheel.slots.setdefault(int(slot), {})[rule_id] = set(subjects)
+        wheel._heap = sorted(wheel.slots)
+        return wheel
+
+    def expire(self, now: pd.Timestamp) -> dict[str, set]:
+        """Pop every bucket whose slot has started by ``now``; returns rule id → subjects."""
+        due: dict[str, set] = {}
+        current = self._slot(now)
+        while self._heap and self._heap[0] <= current:
+            for rule_id, subjects in self.slots.pop(heapq.heappop(self._heap)).items():
+                due.setdefault(rule_id, set()).update(subjects)
+        return due
+
+
+class AlertStore:
+    """Active alerts keyed by (rule id, subject) plus a bounded fired/cleared history."""
+
+    def __init__(self, history_len: int = 500):
+        self.active: dict[tuple[str, str], pd.Timestamp] = {}
+        self.history: deque = deque(maxlen=history_len)
+
+    def fire(self, rule_id: str, subjects: pd.Series, at: pd.Timestamp) -> None:
+        """Raise ``rule_id`` for each subject (index) with its condition start time (value)."""
+        for subject, since in subjects.items():
+            if (rule_id, subject) not in self.active:
+                self.active[(rule_id, subject)] = since
+                self.history.append((at, rule_id, subject, "fired"))
+
+    def clear(self, rule_id: str, subjects, at: pd.Timestamp) -> None:
+        for subject in subjects:
+            if self.active.pop((rule_id, subject), None) is not None:
+                self.history.append((at, rule_id, subject, "cleared"))
+
+    def active_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [(rule_id, subject, since) for (rule_id, subject), since in self.active.items()],
+            columns=["rule_id", "subject", "since"],
         )
-        union_idx = punch_in_ts.index.union(punch_out_ts.index)
-        in_ts = punch_in_ts.reindex(union_idx)
-        out_ts = punch_out_ts.reindex(union_idx)
-        clocked_series = in_ts.notna() & (out_ts.isna() | (in_ts > out_ts))
-        clocked_ids = set(clocked_series[clocked_series].index.astype(str))
-        people_df["clocked_in"] = people_df["associate_id"].astype(str).isin(clocked_ids)
-    except Exception:
-        people_df["clocked_in"] = False
-    return people_df
+
+    def history_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(list(self.history), columns=["at", "rule_id", "subject", "change"])
+
+    @classmethod
+    def from_frames(cls, active: pd.DataFrame, history: pd.DataFrame) -> "AlertStore":
+        store = cls()
+        store.active = {(r, s): since for r, s, since in active[["rule_id", "subject", "since"]].itertuples(index=False)}
+        store.history.extend(history[["at", "rule_id", "subject", "change"]].itertuples(index=False, name=None))
+        return store
+
+
+class AlertEngine:
+    """Evaluates configured rules only for associates (and lines) touched by new events,
+    or whose timers have come due — never by re-scanning the whole people table.
+    """
+
+    def __init__(self, rules: list[dict], wall_clock: bool = False):
+        self.rules = {r["id"]: r for r in rules}
+        self.wall_clock = wall_clock
+        self.state = pd.DataFrame(
+            {
+                **{c: pd.Series(dtype="datetime64[ns]") for c in ["punch_in", "punch_out", "last_scan", "position_since"]},
+                "work_position": pd.Series(dtype="str"),
+                "line": pd.Series(dtype="str"),
+            },
+            index=pd.Index([], name="associate_id", dtype="str"),
+        )
+        self.line_headcount = pd.Series(dtype="int64")
+        self.wheel = TimerWheel()
+        self.store = AlertStore()
+        self.as_of = pd.NaT
+        # Target lines nobody is on never show up in events; check all of them once the clock starts
+        self._lines_pending = True
+
+    def now(self) -> pd.Timestamp:
+        """Alert clock: latest event time, or wall clock if configured (never behind the events)."""
+        if self.wall_clock:
+            wall = pd.Timestamp(datetime.now())
+            return wall if pd.isna(self.as_of) else max(wall, self.as_of)
+        return self.as_of
+
+    def ingest(self, events: pd.DataFrame) -> None:
+        ev = events[events["ASSOCIATE_ID"].notna() & events["START_TIME_LOCAL"].notna()]
+        if ev.empty:
+            return
+        ids = ev["ASSOCIATE_ID"].astype(str)
+        src = ev["SOURCE"].astype(str)
+        pos_lower = ev["WORK_POSITION"].astype(str).str.casefold()
+        workday = src.str.casefold().eq("workday")
+        ts = ev["START_TIME_LOCAL"]
+        update = pd.DataFrame({
+            "punch_in": ts[workday & pos_lower.eq("punch in")].groupby(ids).max(),
+            "punch_out": ts[workday & pos_lower.eq("punch out")].groupby(ids).max(),
+            "last_scan": ts[src.isin(SCANNED_SOURCES)].groupby(ids).max(),
+        })
+
+        # Current position and when its trailing run of identical positions began
+        pos = _position_events(ev)
+        pos = pos[~pos["is_end"]].sort_values(["associate_id", "ts"], kind="stable")
+        run = (
+            (pos["work_position"] != pos.groupby("associate_id", sort=False)["work_position"].shift(1))
+            .groupby(pos["associate_id"]).cumsum()
+        )
+        in_last_run = run == run.groupby(pos["associate_id"]).transform("max")
+        current = (
+            pos[in_last_run].groupby("associate_id")
+            .agg(work_position=("work_position", "last"), line=("line", "last"), position_since=("ts", "min"))
+        )
+        single_run = run.groupby(pos["associate_id"]).max() == 1
+
+        touched = update.index.union(current.index)
+        prev = self.state.reindex(touched)
+        cur = current.reindex(touched)
+        has_pos = cur["work_position"].notna()
+        # Same position continuing from the previous batch keeps its original start
+        continues = has_pos & single_run.reindex(touched, fill_value=False) & (cur["work_position"] == prev["work_position"])
+        new = pd.DataFrame({
+            "punch_in": _latest_ts(prev["punch_in"], update["punch_in"].reindex(touched)),
+            "punch_out": _latest_ts(prev["punch_out"], update["punch_out"].reindex(touched)),
+            "last_scan": _latest_ts(prev["last_scan"], update["last_scan"].reindex(touched)),
+            "work_position": cur["work_position"].where(has_pos, prev["work_position"]),
+            "line": cur["line"].where(has_pos, prev["line"]),
+            "position_since": cur["position_since"].where(has_pos & ~continues, prev["position_since"]),
+        }, index=touched)
+
+        # Line headcounts: move touched associates from their old line to their new one
+        old_lines = _on_line(prev).value_counts()
+        new_lines = _on_line(new).value_counts()
+        self.line_headcount = self.line_headcount.sub(old_lines, fill_value=0).add(new_lines, fill_value=0).astype("int64")
+        touched_lines = old_lines.index.union(new_lines.index)
+
+        self.state = pd.concat([self.state.drop(index=touched, errors="ignore"), new]) if not self.state.empty else new
+        batch_max = ts.max()
+        self.as_of = batch_max if pd.isna(self.as_of) else max(self.as_of, batch_max)
+
+        now = self.now()
+        for rule in self.rules.values():
+            if rule["kind"] == "line_headcount":
+                self._evaluate_lines(rule, touched_lines, now)
+            else:
+                self._evaluate(rule, touched, now)
+
+    def advance(self) -> None:
+        """Re-evaluate only the (rule, subject) pairs whose timers are due (plus, once after start or
+        restore, every configured target line)."""
+        now = self.now()
+        if pd.isna(now):
+            return
+        if self._lines_pending:
+            for rule in self.rules.values():
+                if rule["kind"] == "line_headcount":
+                    self._evaluate_lines(rule, _line_targets(rule).index, now)
+            self._lines_pending = False
+        for rule_id, subjects in self.wheel.expire(now).items():
+            if rule_id in self.rules:
+                self._evaluate(self.rules[rule_id], pd.Index(sorted(subjects)), now)
+
+    def to_checkpoint(self) -> tuple[dict, dict[str, pd.DataFrame]]:
+        return {"as_of": _ts_to_meta(self.as_of)}, {
+            "state": self.state,
+            "line_headcount": self.line_headcount.to_frame("headcount"),
+            "timers": self.wheel.to_frame(),
+            "active": self.store.active_frame(),
+            "history": self.store.history_frame(),
+        }
+
+    @classmethod
+    def from_checkpoint(cls, rules: list[dict], wall_clock: bool, meta: dict, frames: dict[str, pd.DataFrame]) -> "AlertEngine":
+        """Restore state, timers and alerts; rules always come from the current configuration."""
+        engine = cls(rules, wall_clock=wall_clock)
+        engine.state = frames["state"]
+        engine.line_headcount = frames["line_headcount"]["headcount"]
+        engine.wheel = TimerWheel.from_frame(frames["timers"])
+        engine.store = AlertStore.from_frames(frames["active"], frames["history"])
+        engine.as_of = _ts_from_meta(meta["as_of"])
+        return engine
+
+    def _condition_start(self, rule: dict, s: pd.DataFrame) -> pd.Series:
+        """When each associate's condition began (NaT if it does not apply)."""
+        if rule["kind"] == "clocked_no_scan":
+            clocked = s["punch_in"].notna() & (s["punch_out"].isna() | (s["punch_in"] > s["punch_out"]))
+            not_scanned = s["last_scan"].isna() | (s["last_scan"] < s["punch_in"])
+            return s["punch_in"].where(clocked & not_scanned)
+        if rule["kind"] == "position_dwell":
+            in_position = s["work_position"].astype(str).str.casefold().eq(str(rule["position"]).casefold())
+            not_out = s["punch_out"].isna() | (s["punch_out"] < s["position_since"])
+            return s["position_since"].where(in_position & not_out)
+        raise ValueError(f"Unknown alert rule kind: {rule['kind']}")
+
+    def _evaluate(self, rule: dict, ids: pd.Index, now: pd.Timestamp) -> None:
+        s = self.state.reindex(ids)
+        since = pd.to_datetime(self._condition_start(rule, s))
+        due = since + pd.to_timedelta(rule["minutes"], unit="m")
+        firing = due.notna() & (due <= now)
+        pending = due.notna() & (due > now)
+        self.store.fire(rule["id"], since[firing], now)
+        self.store.clear(rule["id"], ids[~firing.to_numpy()], now)
+        self.wheel.schedule(rule["id"], due[pending])
+
+    def _evaluate_lines(self, rule: dict, lines: pd.Index, now: pd.Timestamp) -> None:
+        targets = _line_targets(rule)
+        lines = lines.intersection(targets.index)
+        if lines.empty:
+            return
+        below = self.line_headcount.reindex(lines, fill_value=0) < targets.reindex(lines)
+        self.store.fire(rule["id"], pd.Series(now, index=lines[below.to_numpy()]), now)
+        self.store.clear(rule["id"], lines[~below.to_numpy()], now)
+
+
+def _latest_ts(a: pd.Series, b: pd.Series) -> pd.Series:
+    """Element-wise later of two timestamp series, ignoring NaT."""
+    return b.where(b.notna() & ~(b < a), a)
+
+
+def _on_line(state: pd.DataFrame) -> pd.Series:
+    """Line of each associate's current position, excluding anyone punched out since."""
+    punched_out = state["punch_out"].notna() & (state["punch_out"] >= state["position_since"])
+    return state["line"].where(~punched_out).dropna()
+
+
+def _line_label(value) -> str:
+    """Config line keys (e.g. 99 or "99") in the same label form as tracked lines ('99.0')."""
+    try:
+        return str(float(value))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _line_targets(rule: dict) -> pd.Series:
+    """Target headcount per line label for a line_headcount rule."""
+    return pd.Series({_line_label(k): int(v) for k, v in dict(rule.get("targets", {})).items()}, dtype="int64")
+
+
+def _configured_alert_rules() -> list[dict]:
+    rules = st.secrets.get("ALERT_RULES", None)
+    return [dict(r) for r in rules] if rules else DEFAULT_ALERT_RULES
+
+
+def _alert_wall_clock() -> bool:
+    return str(st.secrets.get("ALERT_CLOCK", "event")) == "wall"
+
+
+# ---------------------------
+# 1d) MULTI-DAY HISTORY (date-partitioned, compacted, retained)
+# ---------------------------
+
+# Partition root (one directory per shift date), hot window, retention and shift-date rollover
+HISTORY_DIR = str(st.secrets.get("HISTORY_DIR", os.path.splitext(DATA_CSV_PATH)[0] + ".history"))
+HISTORY_HOT_DAYS = int(st.secrets.get("HISTORY_HOT_DAYS", 2))
+HISTORY_RETENTION_DAYS = int(st.secrets.get("HISTORY_RETENTION_DAYS", 30))
+# Events before this hour belong to the previous day's shift (night shifts crossing midnight)
+SHIFT_DATE_ROLLOVER_HOUR = int(st.secrets.get("SHIFT_DATE_ROLLOVER_HOUR", 4))
+# Partitions that cannot be written are reported here (server log) and stay hot
+HISTORY_LOG = logging.getLogger("scan2job.history")
+
+
+def shift_date_of(ts: pd.Series) -> pd.Series:
+    """Shift date (midnight timestamp) of each event time."""
+    return (ts - pd.Timedelta(hours=SHIFT_DATE_ROLLOVER_HOUR)).dt.normalize()
+
+
+def build_daily_rollups(events: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Everything the dashboard needs to show one shift, pre-aggregated from its raw events."""
+    people, dwell = PeopleState(), DwellTracker()
+    people.ingest(events)
+    dwell.ingest(events)
+    return {
+        "people": people.snapshot(),
+        "dwell": dwell.position_dwell(),
+        "associates": dwell.associate_summary(),
+        "positions": dwell.positions(),
+    }
+
+
+class HistoryStore:
+    """Events partitioned by shift date.
+
+    The newest ``hot_days`` partitions stay in memory as raw events, persisted as they arrive
+    as append-only Parquet parts under ``<root>/shift_date=YYYY-MM-DD/hot/`` (so a restart
+    picks them up without a checkpoint). Older ones are compacted to ``<root>/shift_date=YYYY-MM-DD/``
+    as zstd Parquet (raw events plus daily rollups), and partitions older than ``retention_days``
+    are deleted. Past shifts are served from the rollups only.
+    """
+
+    def __init__(self, root: str, hot_days: int = 2, retention_days: int = 30):
+        self.root = root
+        self.hot_days = max(1, hot_days)
+        self.retention_days = max(self.hot_days, retention_days)
+        self.hot: dict[date, list[pd.DataFrame]] = {}
+        self._hot_files: dict[date, list[tuple[str, int]]] = {}
+        self._rollups: dict[date, tuple[int, dict[str, pd.DataFrame]]] = {}
+        self._unwritable: set[date] = set()
+        self._load_hot()
+
+    def _dir(self, d: date) -> str:
+        return os.path.join(self.root, f"shift_date={d.isoformat()}")
+
+    def _hot_dir(self, d: date) -> str:
+        return os.path.join(self._dir(d), "hot")
+
+    def _shift_dates_on_disk(self) -> list[tuple[date, str]]:
+        if not os.path.isdir(self.root):
+            return []
+        out = []
+        for name in os.listdir(self.root):
+            if name.startswith("shift_date="):
+                try:
+                    out.append((date.fromisoformat(name.split("=", 1)[1]), os.path.join(self.root, name)))
+                except ValueError:
+                    continue
+        return sorted(out)
+
+    def disk_dates(self) -> list[date]:
+        return [d for d, path in self._shift_dates_on_disk() if os.path.exists(os.path.join(path, "people.parquet"))]
+
+    def dates(self) -> list[date]:
+        return sorted(set(self.hot) | set(self.disk_dates()))
+
+    def _load_hot(self) -> None:
+        """Hot partitions persisted by a previous run (unfinished ``.tmp`` writes are ignored)."""
+        for d, _ in self._shift_dates_on_disk():
+            hot_dir = self._hot_dir(d)
+            if not os.path.isdir(hot_dir):
+                continue
+            files = sorted(os.path.join(hot_dir, n) for n in os.listdir(hot_dir) if n.endswith(".parquet"))
+            try:
+                parts = [pd.read_parquet(f) for f in files]
+            except (OSError, ValueError, pa.ArrowException) as exc:
+                HISTORY_LOG.warning("Ignoring persisted events of shift %s: %s", d, exc)
+                continue
+            if parts:
+                self._open(d)
+                self.hot[d].extend(parts)
+                self._hot_files[d] = [(f, len(part)) for f, part in zip(files, parts)]
+
+    def _open(self, d: date) -> None:
+        """Start holding ``d`` hot; an already compacted shift is reopened so its rollups cover late events too."""
+        events_path = os.path.join(self._dir(d), "events.parquet")
+        if d not in self.hot and os.path.exists(events_path):
+            self.hot[d] = [pd.read_parquet(events_path)]
+        self.hot.setdefault(d, [])
+
+    def ingest(self, events: pd.DataFrame) -> None:
+        ev = events[events["START_TIME_LOCAL"].notna()]
+        if ev.empty:
+            return
+        for d, part in ev.groupby(shift_date_of(ev["START_TIME_LOCAL"]).dt.date):
+            self._open(d)
+            self.hot[d].append(part)
+            self._persist(d, part)
+            self._rollups.pop(d, None)
+        self.compact()
+
+    def _persist(self, d: date, part: pd.DataFrame) -> None:
+        """Append ``part`` to the date's hot files, merging the newest files while the last is at
+        least as large as the one before (so a day of small polls stays a handful of files)."""
+        files = self._hot_files.setdefault(d, [])
+        try:
+            os.makedirs(self._hot_dir(d), exist_ok=True)
+            path = os.path.join(self._hot_dir(d), f"part-{time.time_ns()}.parquet")
+            _write_parquet(part, path)
+            files.append((path, len(part)))
+            while len(files) >= 2 and files[-1][1] >= files[-2][1]:
+                (older, older_rows), (newer, newer_rows) = files[-2], files[-1]
+                merged = pd.concat([pd.read_parquet(older), pd.read_parquet(newer)], ignore_index=True)
+                # The merged file takes the older name so parts stay in arrival order
+                _write_parquet(merged, older)
+                os.remove(newer)
+                files[-2:] = [(older, older_rows + newer_rows)]
+        except (OSError, ValueError, pa.ArrowException) as exc:
+            # Still held in memory and compacted from there; only a restart before then loses it
+            if d not in self._unwritable:
+                HISTORY_LOG.warning("Keeping shift %s in memory only: could not persist events: %s", d, exc)
+                self._unwritable.add(d)
+
+    def _events(self, d: date) -> pd.DataFrame:
+        parts = self.hot[d]
+        if len(parts) > 1:
+            # A replaced or replayed source file repeats rows already held for this date
+            self.hot[d] = parts = [pd.concat(parts, ignore_index=True).drop_duplicates(ignore_index=True)]
+        return parts[0]
+
+    def compact(self) -> None:
+        """Move partitions outside the hot window to disk and apply retention."""
+        dates = self.dates()
+        if not dates:
+            return
+        newest = dates[-1]
+        for d in [d for d in self.hot if (newest - d).days >= self.hot_days]:
+            try:
+                self._write_partition(d, self._events(d))
+            except (OSError, ValueError, pa.ArrowException) as exc:
+                # Keep it hot and retry on the next compaction; log once per date, not every refresh
+                if d not in self._unwritable:
+                    HISTORY_LOG.warning("Keeping shift %s in memory: compaction failed: %s", d, exc)
+                    self._unwritable.add(d)
+                continue
+            self._unwritable.discard(d)
+            shutil.rmtree(self._hot_dir(d), ignore_errors=True)
+            del self.hot[d]
+            self._hot_files.pop(d, None)
+            self._rollups.pop(d, None)
+        for d, path in self._shift_dates_on_disk():
+            if (newest - d).days >= self.retention_days:
+                shutil.rmtree(path, ignore_errors=True)
+                self._rollups.pop(d, None)
+
+    def _write_partition(self, d: date, events: pd.DataFrame) -> None:
+        path = self._dir(d)
+        events_path = os.path.join(path, "events.parquet")
+        if os.path.exists(events_path):
+            # Late events for an already compacted shift: merge (replays may repeat rows)
+            events = pd.concat([pd.read_parquet(events_path), events], ignore_index=True).drop_duplicates()
+        os.makedirs(path, exist_ok=True)
+        # Rollups last: a partition only counts as compacted once people.parquet exists
+        for name, frame in [("events", events), *build_daily_rollups(events).items()]:
+            _write_parquet(frame, os.path.join(path, f"{name}.parquet"))
+
+    def rollup(self, d: date) -> tuple[int, dict[str, pd.DataFrame]]:
+        """(version, rollup frames) for one shift date; never reads raw events of compacted days."""
+        if d in self.hot:
+            events = self._events(d)
+            cached = self._rollups.get(d)
+            if cached is None or cached[0] != len(events):
+                self._rollups[d] = (len(events), build_daily_rollups(events))
+        else:
+            path = self._dir(d)
+            # Versioned by the rollup files, so a rebuild after late events is a new snapshot
+            version = os.stat(os.path.join(path, "people.parquet")).st_mtime_ns
+            cached = self._rollups.get(d)
+            if cached is None or cached[0] != version:
+                self._rollups[d] = (version, {
+                    name: pd.read_parquet(os.path.join(path, f"{name}.parquet"))
+                    for name in ["people", "dwell", "associates", "positions"]
+                })
+        return self._rollups[d]
+
+
+def _write_parquet(frame: pd.DataFrame, path: str) -> None:
+    """zstd Parquet, atomically replacing ``path``."""
+    tmp = f"{path}.tmp"
+    frame.to_parquet(tmp, compression="zstd")
+    os.replace(tmp, path)
+
+# ---------------------------
+# 1e) CHECKPOINT / WARM RESTART
+# ---------------------------
+
+CHECKPOINT_FORMAT = 8
+# Where to checkpoint derived state (empty string disables) and how often (seconds)
+CHECKPOINT_PATH = str(st.secrets.get("CHECKPOINT_PATH", os.path.splitext(DATA_CSV_PATH)[0] + ".checkpoint.zip"))
+CHECKPOINT_EVERY_SEC = int(st.secrets.get("CHECKPOINT_EVERY_SEC", 60))
+
+
+def _ts_to_meta(ts) -> str | None:
+    return None if pd.isna(ts) else pd.Timestamp(ts).isoformat()
+
+
+def _ts_from_meta(value: str | None):
+    return pd.NaT if value is None else pd.Timestamp(value)
+
+
+def write_checkpoint(path: str, meta: dict, frames: dict[str, pd.DataFrame]) -> None:
+    """Write a zip of zstd-compressed Parquet frames plus meta.json, atomically replacing ``path``."""
+    tmp = f"{path}.tmp"
+    with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr("meta.json", json.dumps(meta))
+        for name, frame in frames.items():
+            buf = io.BytesIO()
+            frame.to_parquet(buf, compression="zstd")
+            zf.writestr(f"{name}.parquet", buf.getvalue())
+    os.replace(tmp, path)
+
+
+def read_checkpoint(path: str) -> tuple[dict, dict[str, pd.DataFrame]]:
+    with zipfile.ZipFile(path) as zf:
+        meta = json.loads(zf.read("meta.json"))
+        frames = {
+            name[: -len(".parquet")]: pd.read_parquet(io.BytesIO(zf.read(name)))
+            for name in zf.namelist() if name.endswith(".parquet")
+        }
+    return meta, frames
+
+
+def _component_frames(frames: dict[str, pd.DataFrame], component: str) -> dict[str, pd.DataFrame]:
+    prefix = f"{component}/"
+    return {k[len(prefix):]: v for k, v in frames.items() if k.startswith(prefix)}
+
+
+class LiveState:
+    """Process-wide derived state fed by one CSV tail and shared by every session.
+
+    People, dwell and alerts cover the current (newest) shift date only; every date goes to
+    history. Periodically checkpointed; on startup the checkpoint is restored and only rows
+    appended after its offset are replayed.
+    """
+
+    def __init__(self, csv_path: str, checkpoint_path: str = "", checkpoint_every_sec: int = 60):
+        self.lock = threading.Lock()
+        self.csv_path = csv_path
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every_sec = checkpoint_every_sec
+        self.version = 0
+        # History persists itself (compacted and hot partitions), so it outlives a replaced source file
+        self.history = HistoryStore(HISTORY_DIR, HISTORY_HOT_DAYS, HISTORY_RETENTION_DAYS)
+        self.restored = self._restore()
+        if not self.restored:
+            self._reset()
+            self._last_checkpoint = float("-inf")  # checkpoint as soon as the cold start has caught up
+        self._checkpointed_version = self.version
+
+    def _reset(self) -> None:
+        """Fresh live state from the start of the source file; history is kept."""
+        self.tail = CsvEventTail(self.csv_path)
+        self._reset_shift()
+
+    def _reset_shift(self, shift_date: date | None = None) -> None:
+        self.shift_date = shift_date
+        self.people = PeopleState()
+        self.dwell = DwellTracker()
+        self.alerts = AlertEngine(_configured_alert_rules(), wall_clock=_alert_wall_clock())
+
+    def _live_events(self, events: pd.DataFrame) -> pd.DataFrame:
+        """Events of the current shift date; events of a newer date first roll live state over to it."""
+        days = shift_date_of(events["START_TIME_LOCAL"])
+        newest = days.max()
+        if pd.notna(newest) and (self.shift_date is None or newest.date() > self.shift_date):
+            # The previous shift stays available from history
+            self._reset_shift(newest.date())
+        if self.shift_date is None:
+            return events
+        return events[days.isna() | (days == pd.Timestamp(self.shift_date))]
+
+    def refresh(self) -> None:
+        with self.lock:
+            events, reset = self.tail.poll()
+            if reset:
+                # Live state restarts with the new file; history (hot and compacted) carries over
+                tail = self.tail
+                self._reset()
+                self.tail = tail
+                self.version += 1
+            if not events.empty:
+                self.history.ingest(events)
+                live = self._live_events(events)
+                if not live.empty:
+                    self.people.ingest(live)
+                    self.dwell.ingest(live)
+                    self.alerts.ingest(live)
+                self.version += 1
+            self.alerts.advance()
+            if (
+                self.checkpoint_path
+                and self.version != self._checkpointed_version
+                and time.monotonic() - self._last_checkpoint >= self.checkpoint_every_sec
+            ):
+                self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Persist tail offset/fingerprint and live derived state (caller holds the lock); history
+        persists itself as events arrive."""
+        meta = {"format": CHECKPOINT_FORMAT, "written_at": datetime.now().isoformat(), "version": self.version,
+                "tail": self.tail.to_checkpoint(),
+                "shift_date": self.shift_date.isoformat() if self.shift_date else None}
+        frames: dict[str, pd.DataFrame] = {}
+        for name, component in [("people", self.people), ("dwell", self.dwell), ("alerts", self.alerts)]:
+            meta[name], component_frames = component.to_checkpoint()
+            frames.update({f"{name}/{k}": v for k, v in component_frames.items()})
+        self._last_checkpoint = time.monotonic()
+        try:
+            write_checkpoint(self.checkpoint_path, meta, frames)
+            self._checkpointed_version = self.version
+        except (OSError, ValueError, pa.ArrowException):
+            pass  # read-only or full disk, or a frame Parquet can't store: keep serving; the next interval retries
+
+    def _restore(self) -> bool:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+        try:
+            meta, frames = read_checkpoint(self.checkpoint_path)
+            if meta.get("format") != CHECKPOINT_FORMAT:
+                return False
+            tail = CsvEventTail.from_checkpoint(self.csv_path, meta["tail"])
+            people = PeopleState.from_checkpoint(meta["people"], _component_frames(frames, "people"))
+            dwell = DwellTracker.from_checkpoint(meta["dwell"], _component_frames(frames, "dwell"))
+            alerts = AlertEngine.from_checkpoint(
+                _configured_alert_rules(), _alert_wall_clock(), meta["alerts"], _component_frames(frames, "alerts")
+            )
+        except Exception:
+            # Unreadable, stale or foreign checkpoint: fall back to a full replay
+            return False
+        self.tail, self.people, self.dwell, self.alerts = tail, people, dwell, alerts
+        self.shift_date = date.fromisoformat(meta["shift_date"]) if meta["shift_date"] else None
+        self.version = int(meta["version"])
+        self._last_checkpoint = time.monotonic()
+        return True
+
+
+@st.cache_resource
+def get_live_state(csv_path: str = DATA_CSV_PATH) -> LiveState:
+    return LiveState(csv_path, CHECKPOINT_PATH, CHECKPOINT_EVERY_SEC)
+
+# ---------------------------
+# 1f) SHARED FILTER RESULT CACHE
+# ---------------------------
+
+# Normalized people-table filters; hashable so it can key the shared cache
+PeopleFilter = namedtuple("PeopleFilter", [
+    "id_q", "name_q", "hiring_q", "work_dept_q", "work_pos_q", "scanned",
+    "search_q", "not_scanned", "not_clocked", "dept", "privacy", "supervisor",
+])
+
+
+def _norm_query(q: str) -> str:
+    # Matching is case-insensitive, so fold case for the cache key unless the pattern has escapes (e.g. \D vs \d)
+    q = (q or "").strip()
+    return q if "\\" in q else q.lower()
+
+
+class FilterResultCache:
+    """Process-wide, size-bounded LRU of filtered row positions keyed by (snapshot version, filters).
+
+    Versions are (scope, n) pairs, e.g. (("live", csv_path), 42). Scopes name the source as well
+    (live state of one CSV, or one shift date of one history store), since versions restart from
+    zero for a new source. Publishing a new n for a scope drops that scope's older entries.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: OrderedDict = OrderedDict()
+        self.versions: dict = {}
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get_or_compute(self, version: tuple, key: tuple, compute):
+        scope, n = version
+        with self.lock:
+            if self.versions.get(scope) != n:
+                stale = [k for k in self.entries if k[0] == scope]
+                for k in stale:
+                    del self.entries[k]
+                self.invalidations += len(stale)
+                self.versions[scope] = n
+            if (scope, key) in self.entries:
+                self.entries.move_to_end((scope, key))
+                self.hits += 1
+                return self.entries[(scope, key)]
+            self.misses += 1
+        value = compute()  # outside the lock; concurrent misses for one key just compute twice
+        with self.lock:
+            if self.versions.get(scope) == n:
+                self.entries[(scope, key)] = value
+                self.entries.move_to_end((scope, key))
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "entries": len(self.entries), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions, "invalidations": self.invalidations,
+            }
+
+
+@st.cache_resource
+def get_filter_cache() -> FilterResultCache:
+    return FilterResultCache(int(st.secrets.get("FILTER_CACHE_MAX_ENTRIES", 256)))
+
+
+# people_df column → people table header, in display order
+PEOPLE_DISPLAY_COLUMNS = {
+    "associate_id": "Id",
+    "associate_name": "Name",
+    "job_department": "Hiring Department",
+    "shift_type": "Shift Type",
+    "supervisor_name": "Supervisor Name",
+    "clocked_in": "Clocked In",
+    "scanned_in": "Scanned In",
+    "work_department": "Work Department",
+    "work_position": "Work Position",
+    "last_activity_ts": "Last Activity Timestamp",
+}
+
+
+def build_people_display(df: pd.DataFrame) -> dict:
+    """People table in display form for one snapshot, plain and with names masked.
+
+    The frames (RangeIndex, aligned with df rows) are what filters run on; the Arrow
+    tables are what gets rendered, so a rerun only takes the filtered rows from them.
+    """
+    frame = df[list(PEOPLE_DISPLAY_COLUMNS)].rename(columns=PEOPLE_DISPLAY_COLUMNS).reset_index(drop=True)
+    masked = frame.assign(Name="—")
+    return {
+        "frame": frame,
+        "masked_frame": masked,
+        "table": pa.Table.from_pandas(frame, preserve_index=False),
+        "masked_table": pa.Table.from_pandas(masked, preserve_index=False),
+    }
+
+
+def filter_people_positions(pretty: pd.DataFrame, f: PeopleFilter, rows: np.ndarray | None = None) -> np.ndarray:
+    """Row positions of ``pretty`` (optionally only within ``rows``) matching every filter (AND),
+    ordered by Hiring Department then Name. ``pretty`` must have a RangeIndex."""
+    view = pretty if rows is None else pretty.iloc[rows]
+    for col, q in [("Id", f.id_q), ("Name", f.name_q), ("Hiring Department", f.hiring_q),
+                   ("Work Department", f.work_dept_q), ("Work Position", f.work_pos_q)]:
+        if q:
+            view = view[view[col].astype(str).str.contains(q, case=False, na=False)]
+    if f.scanned != "(any)":
+        view = view[view["Scanned In"] == (f.scanned == "Yes")]
+    if f.search_q:
+        mask_any = view.astype(str).apply(lambda c: c.str.contains(f.search_q, case=False, na=False))
+        view = view[mask_any.any(axis=1)]
+    if f.not_scanned:
+        view = view[view["Scanned In"] == False]
+    if f.not_clocked:
+        view = view[view["Clocked In"] == False]
+    if f.dept != "(any)":
+        view = view[view["Hiring Department"] == f.dept]
+    return view.sort_values(["Hiring Department", "Name"]).index.to_numpy()
 
 # ---------------------------
 # Metric Tile Component (CSV-driven flags)
@@ -450,35 +1552,177 @@ def metric_tile(
 # ---------------------------
 # 2) READ / TRANSFORM
 # ---------------------------
-people_df = load_associates_from_csv()
+# Incremental per-process state: restored from checkpoint on startup, then picks up only
+# rows appended since the last rerun
+live_state = get_live_state(DATA_CSV_PATH)
+live_state.refresh()
+with live_state.lock:
+    history_dates = [d for d in live_state.history.dates() if d != live_state.shift_date]
+
+# Past shifts (everything but the live shift date) are served from daily rollups
+with st.sidebar:
+    shift_pick = st.selectbox(
+        "Shift date",
+        options=["Live"] + [d.isoformat() for d in reversed(history_dates)],
+        index=0,
+        key="shift_date_pick",
+    )
+viewing_history = shift_pick != "Live"
+
+with live_state.lock:
+    if viewing_history:
+        rollup_version, rollup = live_state.history.rollup(date.fromisoformat(shift_pick))
+        snapshot_version = (("history", live_state.history.root, shift_pick), rollup_version)
+    else:
+        people_df = live_state.people.snapshot()
+        snapshot_version = (("live", live_state.csv_path), live_state.version)
+        position_dwell_df = live_state.dwell.position_dwell()
+        associate_dwell_df = live_state.dwell.associate_summary()
+if viewing_history:
+    people_df = rollup["people"]
+    position_dwell_df = rollup["dwell"]
+    associate_dwell_df = rollup["associates"]
+# ---------------------------
+# SUPERVISOR VIEW (?supervisor=<name>): aggregates for every supervisor built once per snapshot
+# ---------------------------
+def build_supervisor_aggregates(df: pd.DataFrame) -> dict[str, dict]:
+    """Per-supervisor cards, breakdowns and team rows from one grouped pass per measure.
+
+    Returns {supervisor: {"rows", "cards", "scanned", "non_scanned"}}; rows are positions into df.
+    """
+    if df.empty or "supervisor_name" not in df.columns:
+        return {}
+    sup = df["supervisor_name"].astype(str).str.strip().to_numpy()
+    rows = df.groupby(sup).indices
+
+    on_floor = df["on_floor"].to_numpy(dtype=bool)
+    cards = (
+        df[on_floor].fillna({"job_department": "—"})
+        .groupby([sup[on_floor], "job_department"])["associate_id"].nunique()
+    )
+
+    # Same ignore rules, grouping and NA labels as the Scanned-in Breakdown
+    work_dept = df["work_department"].astype(str).str.strip()
+    ignore = work_dept.str.casefold().eq("compliance") | work_dept.str.lower().str.contains("time card")
+    scanned_mask = (df["scanned_in"] & ~ignore).to_numpy(dtype=bool)
+    scanned = (
+        pd.DataFrame({
+            "sup": sup,
+            "Department": work_dept.map(WORK_TO_JOB_GROUP).fillna("Other"),
+            "Sub-Department": _clean_labels(work_dept),
+            "Line": _clean_labels(df.get("line", pd.Series(np.nan, index=df.index))),
+            "Work Position": _clean_labels(df["work_position"]),
+            "associate_id": df["associate_id"],
+        })[scanned_mask]
+        .groupby(["sup", "Department", "Sub-Department", "Line", "Work Position"])["associate_id"].nunique()
+    )
+    non_scanned_mask = on_floor & ~df["scanned_in"].to_numpy(dtype=bool)
+    non_scanned = (
+        df[non_scanned_mask].fillna({"job_department": "—"})
+        .groupby([sup[non_scanned_mask], "job_department"])["associate_id"].nunique()
+    )
+
+    def _split(series: pd.Series, columns: list[str]) -> dict[str, pd.DataFrame]:
+        return {
+            name: group.droplevel(0).sort_values(ascending=False).reset_index().set_axis(columns, axis=1)
+            for name, group in series.groupby(level=0)
+        }
+
+    cards_by = _split(cards, ["job_department", "associate_id"])
+    scanned_by = _split(scanned, ["Department", "Sub-Department", "Line", "Work Position", "Associates"])
+    non_scanned_by = _split(non_scanned, ["Job Department", "Associates"])
+    return {
+        name: {
+            "rows": positions,
+            "cards": cards_by.get(name),
+            "scanned": scanned_by.get(name),
+            "non_scanned": non_scanned_by.get(name),
+        }
+        for name, positions in rows.items()
+    }
+
+
+def render_supervisor_breakdowns(aggs: dict) -> None:
+    """Scanned / non-scanned breakdown tables for one supervisor's team (precomputed)."""
+    lcol, rcol = st.columns([1, 1])
+    with lcol:
+        scanned = aggs["scanned"]
+        render_on_floor_header_with_popover(
+            title_text=f"Scanned-in Breakdown ({int(scanned['Associates'].sum()) if scanned is not None else 0})",
+            body_text="Count of this team's associates with a scan event via Badgr, Pick2Light, HighJump",
+        )
+        if scanned is None:
+            st.info("No scanned-in associates.")
+        else:
+            st.dataframe(scanned, use_container_width=True, hide_index=True)
+    with rcol:
+        non_scanned = aggs["non_scanned"]
+        render_on_floor_header_with_popover(
+            title_text=f"Non-Scanned Breakdown ({int(non_scanned['Associates'].sum()) if non_scanned is not None else 0})",
+            body_text="Count of this team's associates by hiring department with a clock-in but no active scan event.",
+        )
+        if non_scanned is None:
+            st.info("No non-scanned associates.")
+        else:
+            st.dataframe(non_scanned, use_container_width=True, hide_index=True)
+
+filter_cache = get_filter_cache()
+
+# Supervisor-scoped wallboard from ?supervisor=<name>; all supervisors' aggregates are built
+# once per snapshot and shared, so each screen is a dictionary lookup
+def _query_param(name: str) -> str:
+    try:
+        val = st.query_params.get(name, "")
+    except Exception:
+        return ""
+    if isinstance(val, list):
+        return val[0] if val else ""
+    return val if isinstance(val, str) else ""
+
+supervisor_names = sorted(people_df["supervisor_name"].dropna().astype(str).str.strip().unique().tolist())
+supervisor_qp = _query_param("supervisor")
+with st.sidebar:
+    supervisor_pick = st.selectbox(
+        "Supervisor view",
+        options=["(all)"] + supervisor_names,
+        index=(supervisor_names.index(supervisor_qp) + 1) if supervisor_qp in supervisor_names else 0,
+        key="supervisor_pick",
+    )
+try:
+    if supervisor_pick == "(all)":
+        if "supervisor" in st.query_params:
+            del st.query_params["supervisor"]
+    elif supervisor_qp != supervisor_pick:
+        st.query_params["supervisor"] = supervisor_pick
+except Exception:
+    pass
+
+supervisor_aggs = None
+if supervisor_pick != "(all)":
+    supervisor_aggs = filter_cache.get_or_compute(
+        snapshot_version, ("__supervisors__",), lambda: build_supervisor_aggregates(people_df)
+    ).get(supervisor_pick)
+    if supervisor_aggs is None:
+        supervisor_aggs = {"rows": np.array([], dtype=int), "cards": None, "scanned": None, "non_scanned": None}
+    st.caption(f"Supervisor view: **{supervisor_pick}**")
+
 # NEW: Render department cards at top
-render_department_cards(people_df)
+if supervisor_aggs is not None:
+    render_department_cards(people_df, supervisor_aggs["cards"] if supervisor_aggs["cards"] is not None else pd.DataFrame())
+else:
+    render_department_cards(people_df)
 
 # ---------------------------
 # MIDDLE: SCANNED / NON-SCANNED BREAKDOWNS (NEW SECTION)
 # ---------------------------
-def render_mid_breakdowns(df: pd.DataFrame) -> None:
+def render_mid_breakdowns(df: pd.DataFrame, dwell_df: pd.DataFrame | None = None) -> None:
     # Ignore Compliance and Time Card punch work departments
     work_dept_series = df.get("work_department", pd.Series([None] * len(df))).astype(str)
     work_dept_clean = work_dept_series.str.strip()
     ignore_mask = work_dept_clean.str.casefold().eq("compliance") | work_dept_clean.str.lower().str.contains("time card")
 
     # Mapping from Work Department -> Job Department (group)
-    map_work_to_job = {
-        "Production": "Production",
-        "Warehouse": "Warehouse",
-        "Fulfillment Training": "Fulfillment Training",
-        "FSQ": "Quality",
-        "Sanitation": "Sanitation",
-        "Shipping": "Shipping",
-        # Sub-departments that belong to Production
-        "Assembly": "Production",
-        "Kitting": "Production",
-        "Site Support": "Production",
-        # Common admin sub-departments treated as Other at the job level
-        "Admin": "Other",
-        "HR/Admin": "Other",
-    }
+    map_work_to_job = WORK_TO_JOB_GROUP
     # Sub-departments for expansion (by Job Department)
     subdepts_by_job = {
         "Production": ["Assembly", "Kitting", "Site Support"],
@@ -622,6 +1866,23 @@ def render_mid_breakdowns(df: pd.DataFrame) -> None:
                                                 .reset_index()
                                                 .rename(columns={"associate_id": "Associates", "work_position": "Work Position"})
                                             )
+                                            # Time-in-position for this group / sub-department / line
+                                            if dwell_df is not None and not dwell_df.empty:
+                                                line_dwell = dwell_df[
+                                                    (dwell_df["job_group"] == dept)
+                                                    & (dwell_df["work_department"] == sname)
+                                                    & (dwell_df["line"] == line_name)
+                                                ]
+                                                pos_table = pos_table.merge(
+                                                    line_dwell[["work_position", "dwell_min", "stints"]]
+                                                    .rename(columns={"work_position": "Work Position"}),
+                                                    on="Work Position", how="left",
+                                                ).fillna({"dwell_min": 0, "stints": 0})
+                                                pos_table["Dwell Min"] = pos_table["dwell_min"].round().astype(int)
+                                                pos_table["Avg Stint Min"] = (
+                                                    pos_table["dwell_min"] / pos_table["stints"].where(pos_table["stints"] > 0)
+                                                ).round(1)
+                                                pos_table = pos_table.drop(columns=["dwell_min", "stints"])
                                             st.dataframe(pos_table, use_container_width=True, hide_index=True)
 
     # RIGHT: Non-Scanned Breakdown (simple table by job department)
@@ -648,7 +1909,10 @@ def render_mid_breakdowns(df: pd.DataFrame) -> None:
             )
             st.dataframe(table, use_container_width=True, hide_index=True)
 
-render_mid_breakdowns(people_df)
+if supervisor_aggs is not None:
+    render_supervisor_breakdowns(supervisor_aggs)
+else:
+    render_mid_breakdowns(people_df, position_dwell_df)
 last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 # CSV-driven model; tiles derive their own view
@@ -658,6 +1922,55 @@ with st.sidebar:
     st.subheader("Filters")
     privacy = st.toggle("Hide names on wallboard", value=False)
 
+# ---------------------------
+# ALERTS (read from the shared alert store; rules are evaluated in live_state.refresh)
+# ---------------------------
+with live_state.lock:
+    alerts_df = live_state.alerts.store.active_frame()
+    alert_history_df = live_state.alerts.store.history_frame()
+    alert_now = live_state.alerts.now()
+    alert_labels = {rid: r.get("label", rid) for rid, r in live_state.alerts.rules.items()}
+
+name_by_id = people_df.assign(associate_id=people_df["associate_id"].astype(str)).set_index("associate_id")["associate_name"]
+if privacy:
+    name_by_id = name_by_id.where(name_by_id.isna(), "—")
+if viewing_history:
+    # Alerts are evaluated on the live stream only
+    alerts_df = alerts_df.iloc[0:0]
+elif supervisor_aggs is not None:
+    # Team members' alerts plus headcount alerts on lines the team is working
+    team_df = people_df.iloc[supervisor_aggs["rows"]]
+    team_subjects = set(team_df["associate_id"].astype(str))
+    team_lines = team_df.get("line", pd.Series(np.nan, index=team_df.index))
+    team_subjects.update(_line_label(v) for v in team_lines.dropna().unique())
+    alerts_df = alerts_df[alerts_df["subject"].astype(str).isin(team_subjects)]
+    alert_history_df = alert_history_df[alert_history_df["subject"].astype(str).isin(team_subjects)]
+render_on_floor_header_with_popover(
+    title_text=f"Alerts ({len(alerts_df)})",
+    body_text="Rules are re-evaluated only for associates or lines touched by new events, or whose timers come due. "
+              "Since = when the condition started.",
+)
+if viewing_history:
+    st.info(f"Alerts are tracked for the live shift only (viewing {shift_pick}).")
+elif alerts_df.empty:
+    st.info("No active alerts.")
+else:
+    alerts_view = pd.DataFrame({
+        "Alert": alerts_df["rule_id"].map(alert_labels),
+        "Associate / Line": alerts_df["subject"],
+        "Name": alerts_df["subject"].map(name_by_id).fillna(""),
+        "Since": alerts_df["since"],
+        "For (min)": ((alert_now - alerts_df["since"]).dt.total_seconds() / 60).round().astype(int),
+    })
+    st.dataframe(alerts_view.sort_values("For (min)", ascending=False), use_container_width=True, hide_index=True)
+with st.expander(f"Alert history ({len(alert_history_df)})", expanded=False):
+    st.dataframe(
+        alert_history_df.iloc[::-1].assign(rule_id=alert_history_df["rule_id"].map(alert_labels)).rename(columns={
+            "at": "At", "rule_id": "Alert", "subject": "Associate / Line", "change": "Change",
+        }),
+        use_container_width=True, hide_index=True,
+    )
+
 # ---------------------------
 # 3) TOP LAYOUT (two columns)
 # ---------------------------
@@ -671,23 +1984,13 @@ left, right = st.columns([1.2, 1.0])
 # 4) BOTTOM: PEOPLE TABLE (detail)
 # ---------------------------
 st.markdown("---")
-filtered = people_df.copy()
-if privacy:
-    filtered = filtered.assign(associate_name="—")
-pretty = filtered[[
-    "associate_id","associate_name","job_department","shift_type","supervisor_name","clocked_in","scanned_in","work_department","work_position","last_activity_ts"
-]].rename(columns={
-    "associate_id":"Id",
-    "associate_name":"Name",
-    "supervisor_name":"Supervisor Name",
-    "job_department":"Hiring Department",
-    "shift_type":"Shift Type",
-    "clocked_in":"Clocked In",
-    "scanned_in":"Scanned In",
-    "work_department":"Work Department",
-    "work_position":"Work Position",
-    "last_activity_ts":"Last Activity Timestamp",
-})
+# Display frames and Arrow tables are built once per snapshot and shared; reruns only take rows from them
+people_display = filter_cache.get_or_compute(
+    snapshot_version, ("__display__",), lambda: build_people_display(people_df)
+)
+pretty = people_display["masked_frame" if privacy else "frame"]
+people_table = people_display["masked_table" if privacy else "table"]
+team_rows = supervisor_aggs["rows"] if supervisor_aggs is not None else None
 
 # Title + compact filter icon (top row)
 title_left, title_right = st.columns([1, 1])
@@ -705,28 +2008,8 @@ with title_right:
             work_pos_q = st.text_input("Work Position contains", "").strip()
             scanned_choice = st.selectbox("Scanned In", ["(any)", "Yes", "No"], index=0)
 
-filtered_pretty = pretty.copy()
-if id_q:
-    filtered_pretty = filtered_pretty[filtered_pretty["Id"].astype(str).str.contains(id_q, case=False, na=False)]
-if name_q:
-    filtered_pretty = filtered_pretty[filtered_pretty["Name"].astype(str).str.contains(name_q, case=False, na=False)]
-if hiring_q:
-    filtered_pretty = filtered_pretty[filtered_pretty["Hiring Department"].astype(str).str.contains(hiring_q, case=False, na=False)]
-if work_dept_q:
-    filtered_pretty = filtered_pretty[filtered_pretty["Work Department"].astype(str).str.contains(work_dept_q, case=False, na=False)]
-if work_pos_q:
-    filtered_pretty = filtered_pretty[filtered_pretty["Work Position"].astype(str).str.contains(work_pos_q, case=False, na=False)]
-if scanned_choice != "(any)":
-    val = scanned_choice == "Yes"
-    filtered_pretty = filtered_pretty[filtered_pretty["Scanned In"] == val]
-
-
-# Dynamic title with count inline with filters + info icon
-render_on_floor_header_with_popover(
-    title_text=f"Latest Associate Activity ({len(filtered_pretty)})",
-    body_text="Last associate activity received and processed by Scan2Job",
-)
-st.caption("Last updated at 15 Oct, 7:32:13am")
+# Dynamic title with count inline with filters + info icon (filled once all filters are known)
+people_header = st.container()
 
 # New controls row: search, quick toggles, department dropdown, clear button
 # If a clear was requested in the previous run, reset widget states BEFORE creating widgets
@@ -752,7 +2035,8 @@ with ctrl_toggles_col:
     with tg2:
         flt_not_clocked = st.toggle("Not Clocked-In", value=st.session_state.get("flt_not_clocked", False), key="flt_not_clocked")
 with ctrl_dept_col:
-    dept_options = ["(any)"] + sorted(pretty["Hiring Department"].dropna().astype(str).unique().tolist())
+    dept_series = pretty["Hiring Department"] if team_rows is None else pretty["Hiring Department"].iloc[team_rows]
+    dept_options = ["(any)"] + sorted(dept_series.dropna().astype(str).unique().tolist())
     dept_pick = st.selectbox("Department", options=dept_options, index=0, key="dept_pick")
 with ctrl_clear_col:
     if st.button("Clear All Filters"):
@@ -760,21 +2044,80 @@ with ctrl_clear_col:
         st.session_state["__do_clear_filters"] = True
         st.rerun()
 
-# Apply new controls to the table
-if search_q:
-    mask_any = filtered_pretty.astype(str).apply(lambda c: c.str.contains(search_q, case=False, na=False))
-    filtered_pretty = filtered_pretty[mask_any.any(axis=1)]
-
-if flt_not_scanned:
-    filtered_pretty = filtered_pretty[filtered_pretty["Scanned In"] == False]
+# Apply all filters; identical views across sessions share one cached result per snapshot
+people_filter = PeopleFilter(
+    id_q=_norm_query(id_q), name_q=_norm_query(name_q), hiring_q=_norm_query(hiring_q),
+    work_dept_q=_norm_query(work_dept_q), work_pos_q=_norm_query(work_pos_q), scanned=scanned_choice,
+    search_q=_norm_query(search_q), not_scanned=bool(flt_not_scanned), not_clocked=bool(flt_not_clocked),
+    dept=dept_pick, privacy=bool(privacy), supervisor=supervisor_pick,
+)
+filtered_positions = filter_cache.get_or_compute(
+    snapshot_version, people_filter, lambda: filter_people_positions(pretty, people_filter, team_rows)
+)
 
-if flt_not_clocked:
-    filtered_pretty = filtered_pretty[filtered_pretty["Clocked In"] == False]
+with people_header:
+    render_on_floor_header_with_popover(
+        title_text=f"Latest Associate Activity ({len(filtered_positions)})",
+        body_text="Last associate activity received and processed by Scan2Job",
+    )
+    st.caption("Last updated at 15 Oct, 7:32:13am")
 
-if dept_pick != "(any)":
-    filtered_pretty = filtered_pretty[filtered_pretty["Hiring Department"] == dept_pick]
+st.dataframe(people_table.take(filtered_positions), use_container_width=True, hide_index=True)
+_fc = filter_cache.stats()
+st.sidebar.caption(
+    f"Filter cache: {_fc['hits']} hits · {_fc['misses']} misses · {_fc['evictions']} evictions · "
+    f"{_fc['invalidations']} invalidated · {_fc['entries']}/{_fc['max_entries']} entries"
+)
 
-st.dataframe(filtered_pretty.sort_values(["Hiring Department","Name"]), use_container_width=True, hide_index=True)
+# ---------------------------
+# Time in Position (associate-level dwell drill-down)
+# ---------------------------
+tip = pretty[["Id", "Name", "Hiring Department"]].take(filtered_positions)
+tip = tip.assign(associate_id=tip["Id"].astype(str)).merge(associate_dwell_df, on="associate_id", how="inner")
+tip = tip.assign(
+    minutes_in_position=tip["minutes_in_position"].fillna(0).round().astype(int),
+    tracked_min=tip["tracked_min"].fillna(0).round().astype(int),
+).rename(columns={
+    "work_position": "Current Position",
+    "line": "Line",
+    "minutes_in_position": "Min in Position",
+    "switches": "Switches",
+    "tracked_min": "Tracked Min",
+})
+render_on_floor_header_with_popover(
+    title_text=f"Time in Position ({len(tip)})",
+    body_text="Minutes since each associate entered their current work position and how often they switched, "
+              "derived from consecutive scan events (a punch out closes the interval). Follows the table filters above.",
+)
+st.dataframe(
+    tip[["Id", "Name", "Hiring Department", "Current Position", "Line", "Min in Position", "Switches", "Tracked Min"]]
+    .sort_values("Min in Position", ascending=False),
+    use_container_width=True, hide_index=True,
+)
+drill_names = dict(zip(tip["associate_id"], tip["Name"].astype(str)))
+drill_id = st.selectbox(
+    "Associate drill-down",
+    options=["(none)"] + sorted(drill_names),
+    format_func=lambda a: a if a == "(none)" else f"{a} — {drill_names.get(a, '')}",
+    key="dwell_pick",
+)
+if drill_id != "(none)":
+    if viewing_history:
+        drill = associate_positions(rollup["positions"], drill_id)
+    else:
+        with live_state.lock:
+            drill = live_state.dwell.associate_positions(drill_id)
+    st.dataframe(
+        drill.assign(dwell_min=drill["dwell_min"].round(1), stints=drill["stints"].astype(int)).rename(columns={
+            "job_group": "Job Group",
+            "work_department": "Work Department",
+            "line": "Line",
+            "work_position": "Work Position",
+            "dwell_min": "Dwell Min",
+            "stints": "Stints",
+        }),
+        use_container_width=True, hide_index=True,
+    )
 
 # ---------------------------
 # After-Shift Activity (out-of-window events)
@@ -785,56 +2128,30 @@ pre_window_minutes = 30
 post_window_minutes = 30
 schedule_cols = {"shift_start_local", "shift_end_local"}
 
-# Build schedule series: use columns if present; else hardcode 7:00 → 17:30 on the date of last activity
-if schedule_cols.issubset(set(filtered.columns)):
-    shift_start_series = pd.to_datetime(filtered.get("shift_start_local"), errors="coerce")
-    shift_end_series = pd.to_datetime(filtered.get("shift_end_local"), errors="coerce")
+# Build schedule series: use columns if present; else hardcode 7:00 → 17:30 on the shift date of last activity
+if schedule_cols.issubset(set(people_df.columns)):
+    shift_start_series = pd.to_datetime(people_df.get("shift_start_local"), errors="coerce")
+    shift_end_series = pd.to_datetime(people_df.get("shift_end_local"), errors="coerce")
 else:
-    last_ts_series_tmp = pd.to_datetime(filtered["last_activity_ts"], errors="coerce")
-    base_date = last_ts_series_tmp.dt.normalize()
+    last_ts_series_tmp = pd.to_datetime(people_df["last_activity_ts"], errors="coerce")
+    base_date = shift_date_of(last_ts_series_tmp)
     shift_start_series = base_date + pd.to_timedelta(7, unit="h")              # 07:00
     shift_end_series = base_date + pd.to_timedelta(17*60 + 30, unit="m")       # 17:30
 
-last_ts_series = pd.to_datetime(filtered["last_activity_ts"], errors="coerce")
+last_ts_series = pd.to_datetime(people_df["last_activity_ts"], errors="coerce")
 
 # Out-of-window = early OR late relative to the shift window
 early_mask = last_ts_series < (shift_start_series - pd.to_timedelta(pre_window_minutes, unit="m"))
 late_mask = last_ts_series >= (shift_end_series + pd.to_timedelta(post_window_minutes, unit="m"))
 out_of_window_mask = early_mask | late_mask
 
-after_ids = set(filtered.loc[out_of_window_mask, "associate_id"].astype(str))
-after_pretty = pretty[pretty["Id"].astype(str).isin(after_ids)].copy()
-
-# Apply the same Filters (Expander)
-ap = after_pretty
-if 'id_q' in locals() and id_q:
-    ap = ap[ap["Id"].astype(str).str.contains(id_q, case=False, na=False)]
-if 'name_q' in locals() and name_q:
-    ap = ap[ap["Name"].astype(str).str.contains(name_q, case=False, na=False)]
-if 'hiring_q' in locals() and hiring_q:
-    ap = ap[ap["Hiring Department"].astype(str).str.contains(hiring_q, case=False, na=False)]
-if 'work_dept_q' in locals() and work_dept_q:
-    ap = ap[ap["Work Department"].astype(str).str.contains(work_dept_q, case=False, na=False)]
-if 'work_pos_q' in locals() and work_pos_q:
-    ap = ap[ap["Work Position"].astype(str).str.contains(work_pos_q, case=False, na=False)]
-if 'scanned_choice' in locals() and scanned_choice != "(any)":
-    _val = scanned_choice == "Yes"
-    ap = ap[ap["Scanned In"] == _val]
-
-# Apply the same Controls Row
-if 'search_q' in locals() and search_q:
-    _mask_any = ap.astype(str).apply(lambda c: c.str.contains(search_q, case=False, na=False))
-    ap = ap[_mask_any.any(axis=1)]
-if 'flt_not_scanned' in locals() and flt_not_scanned:
-    ap = ap[ap["Scanned In"] == False]
-if 'flt_not_clocked' in locals() and flt_not_clocked:
-    ap = ap[ap["Clocked In"] == False]
-if 'dept_pick' in locals() and dept_pick != "(any)":
-    ap = ap[ap["Hiring Department"] == dept_pick]
+# Same filters and ordering as the people table: keep its (cached) rows that are out of window
+after_positions = filtered_positions[out_of_window_mask.to_numpy()[filtered_positions]]
+ap = people_table.take(after_positions)
 
 render_on_floor_header_with_popover(
-    title_text=f"After-Shift Activity ({len(ap)})",
+    title_text=f"After-Shift Activity ({ap.num_rows})",
     body_text=f"Events outside the shift window (before shift start − {pre_window_minutes} min or after shift end + {post_window_minutes} min). Excluded from On Floor.",
 )
 st.caption("Last updated at 15 Oct, 7:32:13am")
-st.dataframe(ap.sort_values(["Hiring Department", "Name"]), use_container_width=True, hide_index=True)
\ No newline at end of file
+st.dataframe(ap, use_container_width=True, hide_index=True)
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Incremental alert engine (run with ``python -m pytest``)."""
+
+import copy
+
+import pandas as pd
+
+T0 = pd.Timestamp("2025-10-13 06:00:00")
+
+
+def _events(app, rows) -> pd.DataFrame:
+    """Events from (associate, minutes after T0, source, position, line) tuples."""
+    events = pd.DataFrame(rows, columns=["ASSOCIATE_ID", "MINUTE", "SOURCE", "WORK_POSITION", "LINE"])
+    events["START_TIME_LOCAL"] = T0 + pd.to_timedelta(events.pop("MINUTE"), unit="m")
+    events["ASSOCIATE_ID"] = events["ASSOCIATE_ID"].astype(str)
+    events["WORK_DEPARTMENT"] = "Assembly"
+    events["LINE"] = app._line_labels(events["LINE"].astype(object))
+    return events
+
+
+def _engine(app, **targets):
+    rules = copy.deepcopy(app.DEFAULT_ALERT_RULES)
+    next(r for r in rules if r["kind"] == "line_headcount")["targets"] = targets
+    return app.AlertEngine(rules)
+
+
+def _active(engine, rule_id: str) -> set:
+    active = engine.store.active_frame()
+    return set(active.loc[active["rule_id"] == rule_id, "subject"])
+
+
+def test_unstaffed_target_line_alerts_from_the_first_ingest(app):
+    engine = _engine(app, **{"3": 1, "7": 2})
+    engine.ingest(_events(app, [("1001", 0, "Pick to Light", "Picker", "3")]))
+    engine.advance()
+    # Nobody has ever scanned on line 7, yet it is below target
+    assert _active(engine, "line_headcount") == {"7.0"}
+
+    engine.ingest(_events(app, [("1002", 1, "Pick to Light", "Picker", "7")]))
+    assert _active(engine, "line_headcount") == {"7.0"}
+    engine.ingest(_events(app, [("1003", 2, "Badgr", "Picker", "7")]))
+    assert _active(engine, "line_headcount") == set()
+
+
+def test_restored_engine_checks_unstaffed_target_lines(app):
+    engine = _engine(app)
+    engine.ingest(_events(app, [("1001", 0, "Pick to Light", "Picker", "3")]))
+    engine.advance()
+    meta, frames = engine.to_checkpoint()
+
+    # A target added to the configuration between runs applies right after restore
+    rules = copy.deepcopy(engine.rules)
+    rules["line_headcount"]["targets"] = {"7": 1}
+    restored = app.AlertEngine.from_checkpoint(list(rules.values()), False, meta, frames)
+    restored.advance()
+    assert _active(restored, "line_headcount") == {"7.0"}
+
+
+def test_clocked_no_scan_needs_a_scan_after_punch_in(app):
+    engine = _engine(app)
+    engine.ingest(_events(app, [
+        ("1001", 0, "Pick to Light", "Picker", "3"),  # scanned before the shift: does not count
+        ("1001", 5, "Workday", "Punch In", None),
+        ("1002", 5, "Workday", "Punch In", None),
+        ("1002", 10, "Badgr", "Picker", "3"),
+    ]))
+    engine.advance()
+    assert _active(engine, "clocked_no_scan") == set()
+
+    engine.ingest(_events(app, [("1003", 26, "Badgr", "Picker", "4")]))
+    engine.advance()
+    assert _active(engine, "clocked_no_scan") == {"1001"}
+
+    engine.ingest(_events(app, [("1001", 27, "HighJump", "Picker", "3")]))
+    assert _active(engine, "clocked_no_scan") == set()
+
+
+def test_position_dwell_fires_when_its_timer_comes_due(app):
+    engine = _engine(app)
+    engine.ingest(_events(app, [
+        ("1001", 0, "Pick to Light", "Picker", "3"),
+        ("1001", 2, "Compliance", "Time Off Task", None),
+    ]))
+    engine.advance()
+    assert _active(engine, "time_off_task") == set()
+    assert not engine.wheel.to_frame().query("rule_id == 'time_off_task'").empty
+
+    # Other associates' events move the clock; only the due timer re-evaluates 1001
+    engine.ingest(_events(app, [("1002", 16, "Badgr", "Picker", "4")]))
+    engine.advance()
+    assert _active(engine, "time_off_task") == set()
+    engine.ingest(_events(app, [("1002", 18, "Badgr", "Picker", "4")]))
+    engine.advance()
+    assert _active(engine, "time_off_task") == {"1001"}
+    assert engine.store.active[("time_off_task", "1001")] == T0 + pd.Timedelta(minutes=2)
+
+    engine.ingest(_events(app, [("1001", 20, "Pick to Light", "Picker", "3")]))
+    assert _active(engine, "time_off_task") == set()
+    assert engine.store.history_frame()["change"].tolist() == ["fired", "cleared"]
+
+
+def test_line_headcount_follows_moves_and_punch_outs(app):
+    engine = _engine(app, **{"3": 2})
+    engine.ingest(_events(app, [
+        ("1001", 0, "Pick to Light", "Picker", "3"),
+        ("1002", 0, "Pick to Light", "Picker", "3"),
+    ]))
+    engine.advance()
+    assert _active(engine, "line_headcount") == set()
+
+    engine.ingest(_events(app, [("1002", 5, "Badgr", "Picker", "L4")]))
+    assert engine.line_headcount.to_dict() == {"3.0": 1, "L4": 1}
+    assert _active(engine, "line_headcount") == {"3.0"}
+
+    engine.ingest(_events(app, [("1002", 8, "Badgr", "Picker", "3")]))
+    assert _active(engine, "line_headcount") == set()
+
+    engine.ingest(_events(app, [("1001", 9, "Workday", "Punch Out", None)]))
+    assert engine.line_headcount.to_dict() == {"3.0": 1, "L4": 0}
+    assert _active(engine, "line_headcount") == {"3.0"}
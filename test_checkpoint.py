@@ -0,0 +1,117 @@
+"""Live-state checkpoints (run with ``python -m pytest``)."""
+
+import csv
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from load_test import write_synthetic_csv
+from test_history import DAYS, _app, _load_day, _tables
+
+
+def _append(tmp_path, *rows) -> None:
+    with open(tmp_path / "scan2job.csv", "a", newline="") as fh:
+        csv.writer(fh).writerows(rows)
+
+
+def _append_bytes(tmp_path, data: bytes) -> None:
+    with open(tmp_path / "scan2job.csv", "ab") as fh:
+        fh.write(data)
+
+
+def test_checkpoint_survives_columns_typed_differently_per_chunk(app, tmp_path):
+    at = _app(tmp_path, checkpoint=True)
+    _load_day(at, tmp_path, DAYS[0])
+    checkpoint = str(tmp_path / "scan2job.checkpoint.zip")
+    before, _ = app.read_checkpoint(checkpoint)
+
+    # Numeric LINE/BAY so far; this chunk alone would infer them as text
+    _append(tmp_path, [
+        "3000001", "Late Arrival", "Day Shift", "Production", "Pick to Light", "Assembly", "Picker",
+        "L4", "B2", "AUTOMATION LINE", f"{DAYS[0].isoformat()} 16:00:00", "Supervisor 00",
+    ])
+    at.run()
+    assert not at.exception
+    after, frames = app.read_checkpoint(checkpoint)
+    assert after["version"] > before["version"]
+    assert "L4" in set(frames["people/latest"]["LINE"])
+
+
+def _split_day(tmp_path, day) -> tuple[bytes, bytes]:
+    """A day's synthetic CSV, split at a row boundary about half way."""
+    path = tmp_path / "full.csv"
+    write_synthetic_csv(str(path), 30, 6, day, seed=day.toordinal())
+    lines = path.read_bytes().splitlines(keepends=True)
+    half = len(lines) // 2
+    return b"".join(lines[:half]), b"".join(lines[half:])
+
+
+def _cold_tables(tmp_path, content: bytes) -> dict[str, pd.DataFrame]:
+    cold = tmp_path / "cold"
+    cold.mkdir()
+    (cold / "scan2job.csv").write_bytes(content)
+    at = _app(cold)
+    assert not at.exception
+    return _tables(at)
+
+
+def _restart(tmp_path) -> AppTest:
+    st.cache_resource.clear()
+    at = _app(tmp_path, checkpoint=True)
+    assert not at.exception
+    return at
+
+
+def _assert_same_tables(actual: dict[str, pd.DataFrame], expected: dict[str, pd.DataFrame]) -> None:
+    for table in expected:
+        pd.testing.assert_frame_equal(actual[table], expected[table])
+
+
+def test_restore_then_replay_matches_an_uninterrupted_run(app, tmp_path):
+    head, rest = _split_day(tmp_path, DAYS[0])
+    expected = _cold_tables(tmp_path, head + rest)
+
+    (tmp_path / "scan2job.csv").write_bytes(head)
+    _app(tmp_path, checkpoint=True)
+    checkpoint = str(tmp_path / "scan2job.checkpoint.zip")
+    before, _ = app.read_checkpoint(checkpoint)
+
+    _append_bytes(tmp_path, rest)
+    at = _restart(tmp_path)
+    _assert_same_tables(_tables(at), expected)
+    # Resumed at the offset: one more refresh on top of the checkpointed version, not a replay from zero
+    after, _ = app.read_checkpoint(checkpoint)
+    assert after["version"] == before["version"] + 1
+    assert after["tail"]["offset"] == len(head + rest)
+
+
+def test_checkpoint_of_another_format_falls_back_to_a_full_replay(app, tmp_path):
+    head, rest = _split_day(tmp_path, DAYS[0])
+    expected = _cold_tables(tmp_path, head + rest)
+
+    (tmp_path / "scan2job.csv").write_bytes(head)
+    _app(tmp_path, checkpoint=True)
+    checkpoint = tmp_path / "scan2job.checkpoint.zip"
+    meta, frames = app.read_checkpoint(str(checkpoint))
+    app.write_checkpoint(str(checkpoint), {**meta, "format": meta["format"] - 1}, frames)
+
+    _append_bytes(tmp_path, rest)
+    at = _restart(tmp_path)
+    _assert_same_tables(_tables(at), expected)
+    assert app.read_checkpoint(str(checkpoint))[0]["version"] == 1
+
+
+def test_checkpoint_of_a_rewritten_file_falls_back_to_a_full_replay(app, tmp_path):
+    head, _ = _split_day(tmp_path, DAYS[0])
+    (tmp_path / "scan2job.csv").write_bytes(head)
+    _app(tmp_path, checkpoint=True)
+
+    # Same day regenerated with different rows: the checkpointed offset no longer fits
+    other = tmp_path / "other.csv"
+    write_synthetic_csv(str(other), 30, 6, DAYS[0], seed=1)
+    expected = _cold_tables(tmp_path, other.read_bytes())
+    (tmp_path / "scan2job.csv").write_bytes(other.read_bytes())
+    at = _restart(tmp_path)
+    _assert_same_tables(_tables(at), expected)
+    assert app.read_checkpoint(str(tmp_path / "scan2job.checkpoint.zip"))[0]["version"] == 1
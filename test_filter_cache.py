@@ -0,0 +1,67 @@
+"""Shared filter result cache (run with ``python -m pytest``)."""
+
+LIVE = ("live", "scan2job.csv")
+PAST = ("history", "history", "2025-10-13")
+
+
+class _Counter:
+    """Builds compute callables that return a label and record each call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, key):
+        def compute():
+            self.calls.append(key)
+            return key
+        return compute
+
+
+def test_evicts_least_recently_used_first(app):
+    cache, compute = app.FilterResultCache(max_entries=3), _Counter()
+    for key in ["a", "b", "c"]:
+        cache.get_or_compute((LIVE, 1), key, compute(key))
+    cache.get_or_compute((LIVE, 1), "a", compute("a"))  # hit: "b" is now the oldest
+    cache.get_or_compute((LIVE, 1), "d", compute("d"))
+
+    assert [key for _, key in cache.entries] == ["c", "a", "d"]
+    cache.get_or_compute((LIVE, 1), "a", compute("a"))
+    cache.get_or_compute((LIVE, 1), "b", compute("b"))
+    assert compute.calls == ["a", "b", "c", "d", "b"]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entries_stay_within_max_entries(app):
+    cache = app.FilterResultCache(max_entries=5)
+    for i in range(20):
+        cache.get_or_compute((LIVE if i % 2 else PAST, 1), i, lambda: i)
+        assert len(cache.entries) <= 5
+    stats = cache.stats()
+    assert (stats["entries"], stats["misses"], stats["evictions"]) == (5, 20, 15)
+
+
+def test_new_version_invalidates_only_its_scope(app):
+    cache, compute = app.FilterResultCache(), _Counter()
+    cache.get_or_compute((LIVE, 1), "a", compute("live a"))
+    cache.get_or_compute((LIVE, 1), "b", compute("live b"))
+    cache.get_or_compute((PAST, 7), "a", compute("past a"))
+
+    assert cache.get_or_compute((LIVE, 2), "a", compute("live a v2")) == "live a v2"
+    assert cache.get_or_compute((PAST, 7), "a", compute("past a again")) == "past a"
+    assert set(cache.entries) == {(LIVE, "a"), (PAST, "a")}
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_compute_that_outlives_its_version_is_not_stored(app):
+    cache = app.FilterResultCache()
+
+    def stale_compute():
+        # A newer snapshot is published while this (older) result is being computed
+        cache.get_or_compute((LIVE, 2), "a", lambda: "fresh")
+        return "stale"
+
+    assert cache.get_or_compute((LIVE, 1), "a", stale_compute) == "stale"
+    assert cache.entries[(LIVE, "a")] == "fresh"
+    assert cache.get_or_compute((LIVE, 2), "a", lambda: "recomputed") == "fresh"
+    assert cache.get_or_compute((LIVE, 3), "b", lambda: "b") == "b"
+    assert (LIVE, "a") not in cache.entries
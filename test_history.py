@@ -0,0 +1,171 @@
+"""Shift history across daily replacement of the source CSV (run with ``python -m pytest``)."""
+
+import csv
+import os
+import zipfile
+from datetime import date, timedelta
+
+import logging
+
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from load_test import APP_PATH, APP_PASSWORD, CSV_COLUMNS, write_synthetic_csv
+
+DAYS = [date(2025, 10, 13) + timedelta(days=i) for i in range(4)]
+
+
+def _app(tmp_path, checkpoint: bool = False) -> AppTest:
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets["APP_PASSWORD"] = APP_PASSWORD
+    at.secrets["DATA_CSV_PATH"] = str(tmp_path / "scan2job.csv")
+    at.secrets["HISTORY_DIR"] = str(tmp_path / "history")
+    at.secrets["HISTORY_HOT_DAYS"] = 2
+    at.secrets["CHECKPOINT_PATH"] = str(tmp_path / "scan2job.checkpoint.zip") if checkpoint else ""
+    at.secrets["CHECKPOINT_EVERY_SEC"] = 0
+    at.run()
+    at.text_input[0].input(APP_PASSWORD)
+    at.button[0].click().run()
+    return at
+
+
+def _load_day(at: AppTest, tmp_path, day: date) -> None:
+    write_synthetic_csv(str(tmp_path / "scan2job.csv"), 30, 6, day, seed=day.toordinal())
+    at.run()
+    at.run()  # the trailing line is held back until the file stops growing
+    assert not at.exception
+
+
+def _partitions(tmp_path) -> list[str]:
+    """Compacted partitions (hot dates only hold their raw event parts on disk)."""
+    history_dir = tmp_path / "history"
+    return sorted(p.name for p in history_dir.glob("shift_date=*") if (p / "people.parquet").exists())
+
+
+def test_replaced_csv_keeps_past_shifts(tmp_path):
+    at = _app(tmp_path)
+    for day in DAYS:
+        _load_day(at, tmp_path, day)
+
+    # Newest two days stay hot; everything older is compacted to disk
+    assert _partitions(tmp_path) == [f"shift_date={d.isoformat()}" for d in DAYS[:-2]]
+    assert at.selectbox(key="shift_date_pick").options == ["Live"] + [d.isoformat() for d in reversed(DAYS[:-1])]
+
+    at.selectbox(key="shift_date_pick").set_value(DAYS[0].isoformat()).run()
+    assert not at.exception
+    people = [df.value for df in at.dataframe if "Last Activity Timestamp" in df.value.columns][0]
+    assert len(people) == 30
+
+
+def test_restore_against_replaced_csv_keeps_hot_partitions(tmp_path):
+    at = _app(tmp_path, checkpoint=True)
+    for day in DAYS[:2]:
+        _load_day(at, tmp_path, day)
+    with zipfile.ZipFile(tmp_path / "scan2job.checkpoint.zip") as zf:
+        # Hot partitions persist themselves; the checkpoint only holds live state
+        assert not [n for n in zf.namelist() if n.startswith("history/")]
+
+    # Restart (drops the process-wide live state) after the source was replaced
+    st.cache_resource.clear()
+    write_synthetic_csv(str(tmp_path / "scan2job.csv"), 30, 6, DAYS[2], seed=DAYS[2].toordinal())
+    at = _app(tmp_path, checkpoint=True)
+    at.run()
+    assert not at.exception
+
+    assert _partitions(tmp_path) == [f"shift_date={DAYS[0].isoformat()}"]
+    assert at.selectbox(key="shift_date_pick").options == ["Live", DAYS[1].isoformat(), DAYS[0].isoformat()]
+
+
+def _tables(at: AppTest) -> dict[str, pd.DataFrame]:
+    return {
+        "people": [df.value for df in at.dataframe if "Last Activity Timestamp" in df.value.columns][0],
+        "dwell": [df.value for df in at.dataframe if "Tracked Min" in df.value.columns][0],
+    }
+
+
+def test_live_covers_only_the_newest_shift_date(tmp_path):
+    # One CSV holding several days: live views must match a file with only the newest day
+    multi, single = tmp_path / "multi", tmp_path / "single"
+    multi.mkdir()
+    single.mkdir()
+    lines = []
+    for day in DAYS:
+        write_synthetic_csv(str(single / "scan2job.csv"), 30, 6, day, seed=day.toordinal())
+        day_lines = (single / "scan2job.csv").read_text().splitlines(keepends=True)
+        lines += day_lines if not lines else day_lines[1:]
+    (multi / "scan2job.csv").write_text("".join(lines))
+
+    live = {}
+    for name, path in [("multi", multi), ("single", single)]:
+        at = _app(path)
+        at.run()
+        assert not at.exception
+        live[name] = _tables(at)
+    for table in ["people", "dwell"]:
+        pd.testing.assert_frame_equal(live["multi"][table], live["single"][table])
+
+
+def test_late_events_refresh_a_compacted_shift(tmp_path):
+    at = _app(tmp_path)
+    for day in DAYS:
+        _load_day(at, tmp_path, day)
+    at.selectbox(key="shift_date_pick").set_value(DAYS[0].isoformat()).run()
+    assert len(_tables(at)["people"]) == 30
+
+    # A late event from a new associate for the compacted first day
+    with open(tmp_path / "scan2job.csv", "a", newline="") as fh:
+        csv.writer(fh).writerow([
+            "3999999", "Late Arrival", "Day Shift", "Production", "Badgr", "Assembly", "Picker",
+            "", "", "", f"{DAYS[0].isoformat()} 10:00:00", "Supervisor 00",
+        ])
+    at.run()
+    assert not at.exception
+    people = _tables(at)["people"]
+    assert len(people) == 31
+    assert "3999999" in set(people["Id"].astype(str))
+
+
+@pytest.fixture
+def store(app, monkeypatch, tmp_path):
+    # Secrets-driven settings are not part of the ``app`` fixture; use their defaults
+    monkeypatch.setitem(app.shift_date_of.__globals__, "SHIFT_DATE_ROLLOVER_HOUR", 4)
+    return app.HistoryStore(str(tmp_path / "history"), hot_days=2)
+
+
+def _day_events(day: date, **values) -> pd.DataFrame:
+    row = {c: "x" for c in CSV_COLUMNS} | {"ASSOCIATE_ID": "3000000", "SOURCE": "Badgr"} | values
+    row["START_TIME_LOCAL"] = pd.Timestamp(f"{day.isoformat()} 08:00:00")
+    return pd.DataFrame([row])
+
+
+def test_partition_parquet_cannot_store_stays_hot(store, tmp_path, caplog):
+    # BAY typed as a number in one part and as text in the next: not one Parquet column type
+    with caplog.at_level(logging.WARNING, logger="scan2job.history"):
+        store.ingest(_day_events(DAYS[0], BAY=1.0))
+        store.ingest(_day_events(DAYS[0], BAY="B2"))
+        store.ingest(_day_events(DAYS[2]))
+        store.ingest(_day_events(DAYS[3]))
+    assert not (tmp_path / "history" / f"shift_date={DAYS[0].isoformat()}" / "people.parquet").exists()
+    assert DAYS[0] in store.hot
+    assert len(store.rollup(DAYS[0])[1]["people"]) == 1
+    # Reported once, not on every refresh
+    assert [r.args[0] for r in caplog.records] == [DAYS[0]]
+
+
+def test_hot_partitions_persist_as_few_parts(store, app, tmp_path):
+    for minute in range(100):
+        events = _day_events(DAYS[0], ASSOCIATE_ID=str(3_000_000 + minute))
+        store.ingest(events.assign(START_TIME_LOCAL=events["START_TIME_LOCAL"] + pd.Timedelta(minutes=minute)))
+    hot_dir = tmp_path / "history" / f"shift_date={DAYS[0].isoformat()}" / "hot"
+    # Merged as they arrive: one part per set bit of the row count
+    assert len(list(hot_dir.glob("*.parquet"))) == bin(100).count("1")
+
+    # A restart reads them back without any checkpoint
+    reloaded = app.HistoryStore(str(tmp_path / "history"), hot_days=2)
+    pd.testing.assert_frame_equal(reloaded.rollup(DAYS[0])[1]["people"], store.rollup(DAYS[0])[1]["people"])
+
+    reloaded.ingest(_day_events(DAYS[2]))
+    assert _partitions(tmp_path) == [f"shift_date={DAYS[0].isoformat()}"]
+    assert not hot_dir.exists()
@@ -0,0 +1,102 @@
+"""Incremental CSV tail (run with ``python -m pytest``)."""
+
+import pandas as pd
+
+SAMPLE_CSV = "Scan2Job Realtime Sample Data.csv"
+
+
+def _sample_lines(n: int) -> list[bytes]:
+    with open(SAMPLE_CSV, "rb") as fh:
+        lines = fh.read().splitlines(keepends=True)[: n + 1]
+    lines[-1] = lines[-1].rstrip(b"\r\n") + b"\n"
+    return lines
+
+
+def test_tail_reads_appended_rows_only(app, tmp_path):
+    lines = _sample_lines(600)
+    path = tmp_path / "events.csv"
+    path.write_bytes(b"".join(lines[:301]))
+    tail = app.CsvEventTail(str(path))
+    first, reset = tail.poll()
+    assert (len(first), reset) == (300, False)
+
+    path.write_bytes(b"".join(lines))
+    second, reset = tail.poll()
+    assert (len(second), reset) == (300, False)
+    full = pd.read_csv(path, dtype=str)
+    assert pd.concat([first, second], ignore_index=True)["ASSOCIATE_ID"].tolist() == full["ASSOCIATE_ID"].tolist()
+
+
+def test_tail_restarts_when_rewritten_past_the_fingerprinted_head(app, tmp_path):
+    lines = _sample_lines(600)
+    path = tmp_path / "events.csv"
+    path.write_bytes(b"".join(lines))
+    tail = app.CsvEventTail(str(path))
+    tail.poll()
+    assert tail.offset > 3 * tail.FINGERPRINT_BYTES
+
+    # An exporter regenerates the file with one corrected row inserted well past the first 4 KB
+    rewritten = lines[:200] + [lines[200].replace(b"Assembly", b"Kitting", 1)] + lines[200:]
+    path.write_bytes(b"".join(rewritten))
+    events, reset = tail.poll()
+    assert reset
+    assert len(events) == 601
+    assert set(events["ASSOCIATE_ID"].astype(str)) <= set(pd.read_csv(path)["ASSOCIATE_ID"].astype(str))
+
+
+def test_tail_restarts_on_same_length_rewrite_near_the_offset(app, tmp_path):
+    lines = _sample_lines(600)
+    path = tmp_path / "events.csv"
+    path.write_bytes(b"".join(lines))
+    tail = app.CsvEventTail(str(path))
+    tail.poll()
+
+    edited = lines[:-1] + [lines[-1].replace(b"Assembly", b"Assemblx", 1)]
+    assert edited != lines
+    path.write_bytes(b"".join(edited))
+    _, reset = tail.poll()
+    assert reset
+
+
+def test_tail_without_trailing_newline_is_read_once(app, tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_bytes(b"".join(_sample_lines(50)).rstrip(b"\n"))
+    tail = app.CsvEventTail(str(path))
+    polls = [tail.poll() for _ in range(3)]
+    assert [(len(ev), reset) for ev, reset in polls] == [(49, False), (1, False), (0, False)]
+
+    # The writer later terminates that row and appends another
+    with open(path, "ab") as fh:
+        fh.write(b"\n" + _sample_lines(51)[-1])
+    events, reset = tail.poll()
+    assert (len(events), reset) == (1, False)
+
+
+HEADER = ("ASSOCIATE_ID,ASSOCIATE_NAME,SHIFT_TYPE,JOB_DEPARTMENT,SOURCE,WORK_DEPARTMENT,WORK_POSITION,"
+          "LINE,BAY,LOCATION,START_TIME_LOCAL,SUPERVISOR_NAME\n")
+
+
+def _row(associate: str, line: str, ts: str, position: str = "Picker", source: str = "Pick to Light") -> str:
+    return f"{associate},Name {associate},Day Shift,Production,{source},Assembly,{position},{line},1,LINE,{ts},Sup\n"
+
+
+def test_line_labels_agree_across_chunks(app, tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_text(HEADER + _row("1", "3", "2025-10-15 07:00:00") + _row("2", "99", "2025-10-15 07:00:00"))
+    tail, people, dwell = app.CsvEventTail(str(path)), app.PeopleState(), app.DwellTracker()
+    for _ in range(2):
+        events, _ = tail.poll()
+        if len(events):
+            people.ingest(events)
+            dwell.ingest(events)
+    with open(path, "a") as fh:
+        fh.write(_row("3", "L4", "2025-10-15 07:05:00") + _row("1", "3", "2025-10-15 07:10:00"))
+    events, _ = tail.poll()
+    people.ingest(events)
+    dwell.ingest(events)
+
+    people_lines = set(people.snapshot()["line"].dropna().astype(str))
+    assert people_lines == {"3.0", "99.0", "L4"}
+    dwell_df = dwell.position_dwell()
+    assert set(dwell_df["line"]) == people_lines
+    assert dwell_df.set_index("line").loc["3.0", "dwell_min"] == 10